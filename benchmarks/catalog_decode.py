@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pyrogram import raw, types
+from pyrogram.raw.core import TLObject
+
+from src.core.models import GiftData
+
+
+def build_catalog(size: int, limited_ratio: float) -> bytes:
+    gifts = []
+    limited_every = max(1, round(1 / limited_ratio)) if limited_ratio > 0 else 0
+
+    for gift_id in range(1, size + 1):
+        limited = bool(limited_every) and gift_id % limited_every == 0
+        sticker = raw.types.Document(
+            id=gift_id,
+            access_hash=gift_id * 7,
+            file_reference=b"\x01" * 32,
+            date=1700000000,
+            mime_type="application/x-tgsticker",
+            size=24000,
+            dc_id=2,
+            attributes=[
+                raw.types.DocumentAttributeSticker(alt="🎁", stickerset=raw.types.InputStickerSetEmpty()),
+                raw.types.DocumentAttributeImageSize(w=512, h=512),
+                raw.types.DocumentAttributeFilename(file_name="sticker.tgs")
+            ],
+            thumbs=[raw.types.PhotoSize(type="m", w=128, h=128, size=4000)]
+        )
+        gifts.append(raw.types.StarGift(
+            id=gift_id,
+            sticker=sticker,
+            stars=50 + gift_id % 1000,
+            convert_stars=40,
+            limited=limited or None,
+            availability_total=10000 if limited else None,
+            availability_remains=5000 if limited else None,
+            upgrade_stars=100 if gift_id % 3 == 0 else None
+        ))
+
+    return raw.types.payments.StarGifts(hash=1, gifts=gifts, chats=[], users=[]).write()
+
+
+async def tl_only_path(payload: bytes) -> list:
+    return TLObject.read(BytesIO(payload)).gifts
+
+
+async def pyrogram_path(payload: bytes) -> list:
+    response = TLObject.read(BytesIO(payload))
+    return [
+        GiftData.from_telegram_gift(await types.Gift._parse_regular(None, gift))
+        for gift in response.gifts if isinstance(gift, raw.types.StarGift)
+    ]
+
+
+async def lean_path(payload: bytes) -> list:
+    response = TLObject.read(BytesIO(payload))
+    return [
+        GiftData.from_raw_star_gift(gift) for gift in response.gifts
+        if isinstance(gift, raw.types.StarGift) and gift.limited
+    ]
+
+
+async def measure(path, payload: bytes, polls: int) -> dict:
+    await path(payload)
+
+    started = time.process_time()
+    for _ in range(polls):
+        await path(payload)
+    cpu_per_poll = (time.process_time() - started) / polls
+
+    tracemalloc.start()
+    result = await path(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'cpu_ms_per_poll': cpu_per_poll * 1000,
+        'peak_kb_per_poll': peak / 1024,
+        'items_returned': len(result)
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Сравнение разбора каталога подарков: pyrogram Gift и сырые TL объекты")
+    parser.add_argument("--size", type=int, default=2000, help="количество подарков в каталоге")
+    parser.add_argument("--limited-ratio", type=float, default=0.05, help="доля лимитированных подарков")
+    parser.add_argument("--polls", type=int, default=50, help="количество проверок для замера CPU")
+    parser.add_argument("--json", action="store_true", help="вывести результат в JSON")
+    args = parser.parse_args()
+
+    payload = build_catalog(args.size, args.limited_ratio)
+
+    results = {
+        'catalog_size': args.size,
+        'payload_kb': len(payload) / 1024,
+        'tl_only': await measure(tl_only_path, payload, args.polls),
+        'pyrogram': await measure(pyrogram_path, payload, args.polls),
+        'lean': await measure(lean_path, payload, args.polls)
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Каталог: {args.size} подарков, {results['payload_kb']:.1f} KB")
+    for name in ('tl_only', 'pyrogram', 'lean'):
+        stats = results[name]
+        print(
+            f"{name:>9}: {stats['cpu_ms_per_poll']:.2f} мс CPU/проверка, "
+            f"пик {stats['peak_kb_per_poll']:.0f} KB, "
+            f"объектов {stats['items_returned']}"
+        )
+
+    speedup = results['pyrogram']['cpu_ms_per_poll'] / max(results['lean']['cpu_ms_per_poll'], 1e-9)
+    print(f"Ускорение: x{speedup:.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
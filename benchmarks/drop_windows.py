@@ -0,0 +1,149 @@
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import config
+from src.core.constants import TimeConstants, Limits
+from src.core.models import GiftAddedEvent, GiftData
+from src.services.catalog_diff import CatalogDiffEngine
+from src.services.drop_windows import DropWindowPredictor, PollMode, parse_schedule
+from src.services.state_store import StateStore
+from src.simulation import SessionRecording
+from src.utils import setup_logger, logger
+
+
+def recorded_drops(path: Path) -> List[float]:
+    recording = SessionRecording.load(path)
+    predictor = DropWindowPredictor()
+    engine = CatalogDiffEngine()
+    
+    for offset, fields in recording.catalogs:
+        for event in engine.apply([GiftData(*item) for item in fields], offset):
+            if isinstance(event, GiftAddedEvent):
+                predictor.observe_added(event, recording.started_at + offset)
+    return predictor.drops
+
+
+def merge_drops(drops: List[float]) -> List[float]:
+    merged: List[float] = []
+    for timestamp in sorted(drops):
+        if not merged or timestamp - merged[-1] >= TimeConstants.DROP_MERGE_WINDOW:
+            merged.append(timestamp)
+    return merged
+
+
+def mode_intervals(check_interval: float, min_interval: float, idle_interval: float) -> Dict[PollMode, float]:
+    return {
+        PollMode.BURST: max(min_interval, check_interval * TimeConstants.BURST_INTERVAL_RATIO),
+        PollMode.NORMAL: check_interval,
+        PollMode.IDLE: max(check_interval, idle_interval)
+    }
+
+
+def evaluate(drops: List[float], predictor: DropWindowPredictor, intervals: Dict[PollMode, float],
+             step: float) -> dict:
+    seconds = {mode: 0.0 for mode in PollMode}
+    at_drop = {mode: 0 for mode in PollMode}
+    polls = 0.0
+    delays = []
+    
+    now = drops[0]
+    for timestamp in drops:
+        while now < timestamp:
+            span = min(step, timestamp - now)
+            mode = predictor.mode_at(now)
+            seconds[mode] += span
+            polls += span / intervals[mode]
+            now += span
+        
+        mode = predictor.mode_at(timestamp)
+        at_drop[mode] += 1
+        delays.append(intervals[mode] / 2)
+        predictor.record_drop(timestamp)
+    
+    duration = sum(seconds.values())
+    baseline_polls = duration / intervals[PollMode.NORMAL]
+    predicted = at_drop[PollMode.BURST] + at_drop[PollMode.IDLE]
+    
+    return {
+        "drops": len(drops),
+        "duration_days": duration / 86400,
+        "windows": [window.label for window in predictor.windows],
+        "drops_in_burst": at_drop[PollMode.BURST],
+        "drops_in_idle": at_drop[PollMode.IDLE],
+        "drops_before_learning": at_drop[PollMode.NORMAL],
+        "recall": at_drop[PollMode.BURST] / predicted if predicted else 0.0,
+        "burst_share": seconds[PollMode.BURST] / duration if duration else 0.0,
+        "idle_share": seconds[PollMode.IDLE] / duration if duration else 0.0,
+        "poll_cost": polls / baseline_polls if baseline_polls else 1.0,
+        "detection_delay": sum(delays) / len(delays),
+        "baseline_detection_delay": intervals[PollMode.NORMAL] / 2
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Офлайн-проверка предсказания окон дропов на записанной истории")
+    parser.add_argument("recordings", type=Path, nargs="*", help="файлы записи logs/session_*.jsonl")
+    parser.add_argument("--state", type=Path, action="append", default=[], help="файл состояния с историей дропов")
+    parser.add_argument("--check-interval", type=float, default=config.CHECK_INTERVAL, help="CHECK_INTERVAL (сек)")
+    parser.add_argument("--min-interval", type=float, default=config.POLL_INTERVAL_MIN, help="POLL_INTERVAL_MIN (сек)")
+    parser.add_argument("--idle-interval", type=float, default=config.IDLE_POLL_INTERVAL, help="IDLE_POLL_INTERVAL (сек)")
+    parser.add_argument("--margin", type=float, default=TimeConstants.DROP_WINDOW_MARGIN / 60, help="запас окна (мин)")
+    parser.add_argument("--min-support", type=int, default=Limits.DROP_WINDOW_MIN_SUPPORT, help="сколько разных дней нужно для окна")
+    parser.add_argument("--schedule", nargs="*", default=config.DROP_SCHEDULE, help="ручные окна, например 14:00-15:30")
+    parser.add_argument("--json", action="store_true", help="вывести результат в JSON")
+    args = parser.parse_args()
+    
+    setup_logger()
+    logger.remove()
+    
+    drops: List[float] = []
+    for path in args.recordings:
+        drops.extend(recorded_drops(path))
+    for path in args.state:
+        store = StateStore(path)
+        store.load()
+        drops.extend(store.drops)
+    
+    drops = merge_drops(drops)
+    if not drops:
+        print("в истории нет дропов")
+        return
+    
+    predictor = DropWindowPredictor(
+        parse_schedule(args.schedule), margin=args.margin * 60, min_support=args.min_support
+    )
+    report = evaluate(
+        drops, predictor,
+        mode_intervals(args.check_interval, args.min_interval, args.idle_interval),
+        TimeConstants.POLL_MODE_CHECK_INTERVAL
+    )
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    
+    print(
+        f"дропов {report['drops']} за {report['duration_days']:.1f} дн, "
+        f"окна: {', '.join(report['windows']) or '-'} UTC"
+    )
+    print(
+        f"после обучения в окне {report['drops_in_burst']}, вне окна {report['drops_in_idle']} "
+        f"(recall {report['recall'] * 100:.0f}%), до обучения {report['drops_before_learning']}"
+    )
+    print(
+        f"время в burst {report['burst_share'] * 100:.1f}%, в idle {report['idle_share'] * 100:.1f}%, "
+        f"запросов {report['poll_cost'] * 100:.0f}% от постоянного CHECK_INTERVAL"
+    )
+    print(
+        f"средняя задержка обнаружения одним аккаунтом {report['detection_delay']:.1f} сек "
+        f"(без предсказания {report['baseline_detection_delay']:.1f} сек)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import config
+from src.core.models import GiftCriteria, PurchaseSucceededEvent
+from src.services.monitor import GiftMonitor
+from src.simulation import FakeGiftMarket, FakeTelegramClient, rtt_distribution, run_virtual
+from src.utils import setup_logger, logger, percentile, clock
+
+
+PAYMENT_METHODS = ("GetPaymentForm", "SendStarsForm")
+
+
+def build_market(catalog_size: int) -> FakeGiftMarket:
+    market = FakeGiftMarket()
+    for gift_id in range(1, catalog_size + 1):
+        limited = gift_id % 4 == 0
+        market.add_gift(gift_id, price=25 * (1 + gift_id % 20), total=1000 if limited else None)
+        if limited and gift_id % 8 == 0:
+            market.set_remaining(gift_id, 0)
+    return market
+
+
+async def race(market: FakeGiftMarket, gift_id: int, rate: float) -> None:
+    while market.remaining(gift_id):
+        await asyncio.sleep(1 / rate)
+        market.set_remaining(gift_id, market.remaining(gift_id) - 1)
+
+
+async def run_case(accounts: int, args: argparse.Namespace) -> dict:
+    random.seed(args.seed)
+    market = build_market(args.catalog_size)
+    clients = [
+        FakeTelegramClient(
+            market,
+            name=f"bench_{idx}",
+            balance=args.balance,
+            rtt=rtt_distribution(args.rtt, args.seed + idx),
+            flood_probability=args.flood_probability,
+            flood_seconds=args.flood_seconds,
+            seed=args.seed + idx
+        )
+        for idx in range(accounts)
+    ]
+    
+    monitor = GiftMonitor(clients, clients, [GiftCriteria(1, 10 ** 9, 1, 10 ** 9, args.quantity)])
+    for gift in market.gifts():
+        if gift.limited:
+            monitor.registry.claim(gift.id)
+    
+    finished_at = {}
+    
+    async def on_purchase_succeeded(event: PurchaseSucceededEvent) -> None:
+        finished_at[event.gift_id] = clock.monotonic()
+    
+    monitor.events.subscribe(PurchaseSucceededEvent, on_purchase_succeeded)
+    
+    await monitor.initialize()
+    await monitor.start()
+    
+    cpu_started = time.process_time()
+    checks_started = monitor.stats_manager.get_performance_stats()['total_checks']
+    await asyncio.sleep(args.warmup)
+    polls = monitor.stats_manager.get_performance_stats()['total_checks'] - checks_started
+    cpu_per_poll = (time.process_time() - cpu_started) / polls if polls else 0.0
+    
+    calls_started = {method: sum(client.calls.get(method, 0) for client in clients) for method in PAYMENT_METHODS}
+    dropped_at = {}
+    racers = []
+    for drop in range(args.drops):
+        gift_id = args.catalog_size + drop + 1
+        market.add_gift(gift_id, price=args.price, total=args.supply)
+        dropped_at[gift_id] = clock.monotonic()
+        if args.race_rate > 0:
+            racers.append(asyncio.create_task(race(market, gift_id, args.race_rate)))
+        await asyncio.sleep(args.drop_window)
+    
+    await monitor.stop()
+    for racer in racers:
+        racer.cancel()
+    
+    detection, first_purchase, purchase_time = [], [], 0.0
+    for gift_id, dropped in dropped_at.items():
+        trace = monitor.tracer.get(gift_id)
+        if trace is None:
+            continue
+        detection.extend(span.end - dropped for span in trace.spans if span.name == "diff")
+        if trace.first_success is not None:
+            first_purchase.append(trace.first_success - dropped)
+            if gift_id in finished_at:
+                purchase_time += finished_at[gift_id] - trace.first_success
+    
+    bought = sum(market.sold.get(gift_id, 0) for gift_id in dropped_at)
+    payment_calls = sum(
+        sum(client.calls.get(method, 0) for client in clients) - calls_started[method]
+        for method in PAYMENT_METHODS
+    )
+    errors = {}
+    for client in clients:
+        for error, count in client.errors.items():
+            errors[error] = errors.get(error, 0) + count
+    
+    return {
+        'accounts': accounts,
+        'drops': args.drops,
+        'detected': len(detection),
+        'detection_p50_ms': percentile(detection, 50) * 1000,
+        'detection_p95_ms': percentile(detection, 95) * 1000,
+        'first_purchase_p50_ms': percentile(first_purchase, 50) * 1000,
+        'first_purchase_p95_ms': percentile(first_purchase, 95) * 1000,
+        'bought': bought,
+        'units_per_s': bought / purchase_time if purchase_time > 0 else 0.0,
+        'wasted_rpc': payment_calls - 2 * bought,
+        'rpc_total': sum(client.total_calls for client in clients),
+        'polls': polls,
+        'cpu_per_poll_ms': cpu_per_poll * 1000,
+        'errors': errors
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Горячий путь обнаружения и покупки на фейковом Telegram")
+    parser.add_argument("--accounts", default="1,10,50,100,500", help="количество аккаунтов через запятую")
+    parser.add_argument("--catalog-size", type=int, default=100, help="количество подарков в каталоге")
+    parser.add_argument("--rtt", default="lognormal:0.08:0.4", help="RTT: fixed:S, uniform:MIN:MAX, lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--flood-probability", type=float, default=0.001, help="вероятность FloodWait на запрос")
+    parser.add_argument("--flood-seconds", type=int, default=5, help="длительность FloodWait (сек)")
+    parser.add_argument("--check-interval", type=float, default=config.CHECK_INTERVAL, help="CHECK_INTERVAL (сек)")
+    parser.add_argument("--drops", type=int, default=5, help="количество новых подарков")
+    parser.add_argument("--drop-window", type=float, default=30.0, help="время между выходами подарков (сек)")
+    parser.add_argument("--supply", type=int, default=500, help="тираж нового подарка")
+    parser.add_argument("--price", type=int, default=50, help="цена нового подарка")
+    parser.add_argument("--quantity", type=int, default=200, help="сколько штук покупать по критерию")
+    parser.add_argument("--race-rate", type=float, default=50.0, help="скорость раскупки конкурентами (шт/сек, 0 - нет)")
+    parser.add_argument("--balance", type=int, default=1000000, help="баланс Stars каждого аккаунта")
+    parser.add_argument("--warmup", type=float, default=60.0, help="прогрев до первого подарка (сек)")
+    parser.add_argument("--seed", type=int, default=0, help="seed для воспроизводимых результатов")
+    parser.add_argument("--output", type=Path, help="записать результат в JSON файл")
+    parser.add_argument("--json", action="store_true", help="вывести результат в JSON")
+    args = parser.parse_args()
+    
+    config.CHECK_INTERVAL = args.check_interval
+    config.PURCHASE_DELAY = 0
+    config.RECORD_SESSION = False
+    config.TRACE_EXPORT = False
+    config.METRICS_PORT = 0
+    config.LOOP_STALL_THRESHOLD = 0
+    
+    setup_logger()
+    logger.remove()
+    
+    results = []
+    for accounts in [int(value) for value in args.accounts.split(",")]:
+        started = time.perf_counter()
+        result = run_virtual(run_case(accounts, args))
+        result['wall_time_s'] = time.perf_counter() - started
+        results.append(result)
+    
+    report = {
+        'params': {key: str(value) if isinstance(value, Path) else value for key, value in vars(args).items()},
+        'results': results
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    
+    for r in results:
+        print(
+            f"аккаунтов={r['accounts']}: обнаружение p50 {r['detection_p50_ms']:.0f} мс "
+            f"(p95 {r['detection_p95_ms']:.0f} мс), первая покупка p50 {r['first_purchase_p50_ms']:.0f} мс, "
+            f"{r['units_per_s']:.1f} шт/сек, куплено {r['bought']}, лишних RPC {r['wasted_rpc']}, "
+            f"CPU {r['cpu_per_poll_ms']:.2f} мс/проверка"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import config
+from src.services.buyer import GiftBuyer
+from src.simulation import FakeGiftMarket, FakeTelegramClient
+from src.utils import setup_logger, logger
+
+
+async def run_case(prefetch: int, window: int, quantity: int, rtt: float) -> dict:
+    config.PAYMENT_FORM_PREFETCH = prefetch
+    config.PURCHASE_WINDOW = window
+    config.PURCHASE_WINDOW_MAX = window
+    config.PURCHASE_DELAY = 0
+    
+    market = FakeGiftMarket()
+    market.add_gift(gift_id=1, price=10, total=quantity * 10)
+    client = FakeTelegramClient(market, name="bench_buyer", balance=quantity * 10, rtt=rtt)
+    
+    buyer = GiftBuyer(client, ["target_one", "target_two"], 0)
+    await buyer.initialize()
+    
+    started = time.monotonic()
+    result = await buyer.buy_gift(1, quantity)
+    elapsed = time.monotonic() - started
+    
+    return {
+        'prefetch': prefetch,
+        'window': window,
+        'bought': result.bought,
+        'elapsed_s': elapsed,
+        'units_per_s': result.bought / elapsed if elapsed > 0 else 0.0,
+        'rpc_per_unit': result.rpc_per_unit,
+        'avg_unit_latency_ms': result.avg_unit_latency * 1000,
+        'avg_unit_latency_rtt': result.avg_unit_latency / rtt if rtt > 0 else 0.0
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Задержка покупки подарка с предзагрузкой форм оплаты и без нее")
+    parser.add_argument("--quantity", type=int, default=200, help="количество покупаемых подарков")
+    parser.add_argument("--rtt", type=float, default=0.05, help="задержка одного запроса к Telegram (сек)")
+    parser.add_argument("--json", action="store_true", help="вывести результат в JSON")
+    args = parser.parse_args()
+    
+    setup_logger()
+    logger.remove()
+    
+    cases = [(0, 1), (4, 1), (0, 4), (4, 4)]
+    results = [await run_case(prefetch, window, args.quantity, args.rtt) for prefetch, window in cases]
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    
+    for r in results:
+        print(
+            f"предзагрузка={r['prefetch']} окно={r['window']}: {r['units_per_s']:.1f} шт/сек, "
+            f"{r['rpc_per_unit']:.2f} RPC/шт, задержка {r['avg_unit_latency_ms']:.0f} мс "
+            f"({r['avg_unit_latency_rtt']:.2f} RTT)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
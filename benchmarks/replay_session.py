@@ -0,0 +1,57 @@
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import config
+from src.simulation import SessionRecording, SessionReplay
+from src.utils import setup_logger, logger, ConfigValidator
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Воспроизведение записанной сессии на виртуальных часах")
+    parser.add_argument("recording", type=Path, help="файл записи logs/session_*.jsonl")
+    parser.add_argument("--buyers", type=int, default=len(config.BUYER_SESSIONS), help="количество покупателей")
+    parser.add_argument("--hunters", type=int, default=2, help="количество охотников")
+    parser.add_argument("--check-interval", type=float, default=config.CHECK_INTERVAL, help="CHECK_INTERVAL (сек)")
+    parser.add_argument("--balance", type=int, default=100000, help="баланс Stars каждого покупателя")
+    parser.add_argument("--flood-seconds", type=int, default=5, help="длительность FloodWait из записи (сек)")
+    parser.add_argument("--seed", type=int, default=0, help="seed для воспроизводимых задержек")
+    parser.add_argument("--json", action="store_true", help="вывести результат в JSON")
+    args = parser.parse_args()
+    
+    setup_logger()
+    logger.remove()
+    
+    recording = SessionRecording.load(args.recording)
+    replay = SessionReplay(
+        recording,
+        criteria=ConfigValidator.parse_criteria(config),
+        buyers=args.buyers,
+        hunters=args.hunters,
+        balance=args.balance,
+        flood_seconds=args.flood_seconds,
+        seed=args.seed,
+        settings={"CHECK_INTERVAL": args.check_interval}
+    )
+    report = replay.run()
+    
+    if args.json:
+        print(json.dumps(asdict(report), indent=2))
+        return
+    
+    print(
+        f"сессия {report.duration:.0f} сек воспроизведена за {report.wall_time:.2f} сек: "
+        f"{report.checks} проверок, {report.rpc_calls} RPC, куплено {report.bought} за {report.spent} ⭐"
+    )
+    for gift in report.gifts:
+        detection = f"{gift.detection_delay * 1000:.0f} мс" if gift.detection_delay is not None else "-"
+        purchase = f"{gift.purchase_delay * 1000:.0f} мс" if gift.purchase_delay is not None else "-"
+        print(f"подарок {gift.gift_id}: обнаружен через {detection}, первая покупка через {purchase}, куплено {gift.bought}")
+
+
+if __name__ == "__main__":
+    main()
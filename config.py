@@ -23,6 +23,10 @@ HUNTER_SESSIONS: list[str] = [
     # "session_two"
 ]
 
+# Сколько аккаунтов подключать одновременно при запуске
+# охотники подключаются после старта мониторинга и сразу встают в ротацию, не дожидаясь остальных
+CLIENT_STARTUP_CONCURRENCY: int = 8
+
 # ===============================================================
 # ===============================================================
 
@@ -55,22 +59,84 @@ PURCHASE_CRITERIA: list[tuple[int, int, int, int, int]] = [
 # ===============================================================
 
 # Задержка между покупаками подарков одним аккаунтом (в секундах)
+# при окне больше 1 задержка делится на размер окна
 PURCHASE_DELAY: float = 0.1
 
+# Сколько покупок один аккаунт отправляет одновременно (1 - строго по очереди)
+# при FloodWait окно автоматически уменьшается вдвое, при успешных покупках снова растет до PURCHASE_WINDOW_MAX
+PURCHASE_WINDOW: int = 4
+PURCHASE_WINDOW_MAX: int = 16
+
+# Сколько форм оплаты запрашивать заранее, пока отправляются предыдущие подарки (0 - без предзагрузки)
+# с предзагрузкой каждая покупка ждет только один запрос к Telegram вместо двух
+PAYMENT_FORM_PREFETCH: int = 4
+
 # Покупать любой доступный подарок если не удалось купить подарки по критериям
 # False - покупать только подарки которые подходят под критерии
 # True - если не удалось купить по критериям, купить любой доступный подарок на который хватит баланса
 FALLBACK_PURCHASE: bool = False
 
+# Останавливать покупку, когда по скорости распродажи (остаток из каталога + свои покупки) подарок
+# закончится раньше, чем дойдет следующая покупка. Экономит запросы, которые все равно получили бы GIFT_SOLD_OUT
+STOP_DOOMED_PURCHASES: bool = True
+
 # ===============================================================
 # ===============================================================
 
 # Интервал между проверками для каждого охотника (секунды)
+# охотники проверяют по очереди в своих слотах, поэтому весь флот проверяет раз в CHECK_INTERVAL / кол-во охотников
 CHECK_INTERVAL: float = 7
 
-# Добавить случайную задержку (0-X секунд) для имитации человека
+# Режим проверки каталога подарков через hash (сервер отвечает "не изменилось" без загрузки каталога)
+# "shared" - один hash на всех охотников, "hunter" - свой hash у каждого охотника, "off" - всегда полный каталог
+CATALOG_HASH_MODE: str = "shared"
+
+# Быстрый разбор каталога: брать только нужные поля из сырых объектов Telegram, без создания Gift со стикерами
+# False - использовать стандартный разбор pyrogram (медленнее)
+LEAN_CATALOG_DECODE: bool = True
+
+# Добавить случайное смещение слота (±X секунд) для имитации человека
+# смещение ограничивается 10% ширины слота, чтобы охотники не сбивались в кучу
 RANDOM_DELAY_MAX: float = 1
 
+# Подстраивать частоту опроса под каждый аккаунт: интервал плавно сокращается, пока запросы проходят,
+# и увеличивается вдвое при FloodWait или ошибке. Найденный безопасный интервал сохраняется между запусками
+# CHECK_INTERVAL - начальный интервал, POLL_INTERVAL_MIN - самый частый допустимый опрос одним аккаунтом (секунды)
+ADAPTIVE_POLLING: bool = True
+POLL_INTERVAL_MIN: float = 2
+
+# Предсказание окон выхода подарков: время новых дропов запоминается, и вокруг ожидаемых окон
+# охотники опрашивают вдвое чаще, а в остальное время не чаще раза в IDLE_POLL_INTERVAL секунд
+# пока окна не выучены (нужно минимум два дропа в разные дни в похожее время) и DROP_SCHEDULE пуст, опрос обычный
+DROP_PREDICTION: bool = True
+IDLE_POLL_INTERVAL: float = 30
+
+# Ручные окна частого опроса в UTC, работают вместе с выученными: "14:00-15:30" каждый день, "fri 13:00-14:00" по пятницам
+DROP_SCHEDULE: list[str] = [
+    # "14:00-15:30",
+]
+
+# ===============================================================
+# ===============================================================
+
+# Сохранять состояние (известные/обработанные подарки, покупки) в папку state между перезапусками
+# при перезапуске уже обработанные подарки не будут снова считаться новыми
+PERSIST_STATE: bool = True
+
+# Записывать трассировку каждого подарка (тайминги от обнаружения до первой покупки) в logs/gift_traces.jsonl
+TRACE_EXPORT: bool = False
+
+# Порт для метрик в формате Prometheus (http://127.0.0.1:ПОРТ/metrics), 0 - выключено
+METRICS_PORT: int = 0
+
+# Записывать снимки каталога и задержки запросов в logs/session_*.jsonl для последующего воспроизведения
+# запись воспроизводится на виртуальных часах: python benchmarks/replay_session.py logs/session_*.jsonl
+RECORD_SESSION: bool = False
+
+# Сторож цикла событий: если цикл занят дольше порога (секунды), в лог пишется стек блокирующего кода
+# блокировки во время покупки отмечаются отдельно, 0 - выключено
+LOOP_STALL_THRESHOLD: float = 0.1
+
 # ===============================================================
 # ===============================================================
 
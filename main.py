@@ -8,7 +8,7 @@ sys.path.append(str(Path(__file__).parent))
 
 import config
 from src.core.constants import AppInfo, FileConstants
-from src.services import GiftMonitor
+from src.services import GiftMonitor, StateStore
 from src.telegram import ClientManager, NotificationBot
 from src.utils import logger, setup_logger, ConfigValidator
 
@@ -18,9 +18,10 @@ class GiftSniperApp:
     def __init__(self):
         self.monitor: Optional[GiftMonitor] = None
         self.notification_bot: Optional[NotificationBot] = None
-        self.client_manager = ClientManager(Path(FileConstants.SESSIONS_DIR))
+        self.client_manager = ClientManager(Path(FileConstants.SESSIONS_DIR), config.CLIENT_STARTUP_CONCURRENCY)
         self._running = False
         self._clients = {'buyers': [], 'hunters': []}
+        self._hunter_startup: Optional[asyncio.Task] = None
     
 
     async def validate_config(self) -> bool:
@@ -49,20 +50,34 @@ class GiftSniperApp:
     
 
     async def start_clients(self) -> bool:
-        result = await self.client_manager.create_and_start_clients(
-            buyer_sessions=config.BUYER_SESSIONS,
-            hunter_sessions=config.HUNTER_SESSIONS,
-            use_buyers_as_hunters=config.USE_BUYERS_AS_HUNTERS
-        )
+        buyers = await self.client_manager.start_buyers(config.BUYER_SESSIONS)
         
-        if not result['success']:
+        if not buyers:
             logger.error("* Не удалось запустить клиенты")
             return False
         
-        self._clients = result
+        self._clients['buyers'] = buyers
+        if config.USE_BUYERS_AS_HUNTERS:
+            self._clients['hunters'].extend(buyers)
+            logger.info(f"Покупатели также используются как охотники ({len(buyers)} шт)")
         return True
     
 
+    def _on_hunter_ready(self, client) -> None:
+        self._clients['hunters'].append(client)
+        if self.monitor:
+            self.monitor.add_hunter(client)
+    
+
+    async def start_hunters(self) -> None:
+        hunters = await self.client_manager.start_hunters(config.HUNTER_SESSIONS, on_ready=self._on_hunter_ready)
+        
+        if config.HUNTER_SESSIONS:
+            logger.info(f"Охотников подключено: {len(hunters)}/{len(config.HUNTER_SESSIONS)}")
+        if not self._clients['hunters']:
+            logger.error("* Ни один охотник не запущен, новые подарки не будут обнаружены")
+    
+
     async def run(self) -> None:
         logger.info(f"^ Запуск {AppInfo.NAME} v{AppInfo.VERSION}...")
         
@@ -76,11 +91,17 @@ class GiftSniperApp:
         
         criteria = ConfigValidator.parse_criteria(config)
         
+        state_store = None
+        if config.PERSIST_STATE:
+            state_store = StateStore(Path(FileConstants.STATE_DIR) / FileConstants.STATE_FILE)
+            state_store.load()
+        
         self.monitor = GiftMonitor(
             buyer_clients=self._clients['buyers'],
             hunter_clients=self._clients['hunters'],
             criteria=criteria,
-            notification_bot=self.notification_bot
+            notification_bot=self.notification_bot,
+            state_store=state_store
         )
 
         if self.notification_bot:
@@ -93,6 +114,7 @@ class GiftSniperApp:
         
         self._running = True
         await self.monitor.start()
+        self._hunter_startup = asyncio.create_task(self.start_hunters())
         
         try:
             while self._running:
@@ -108,6 +130,10 @@ class GiftSniperApp:
     async def cleanup(self) -> None:
         logger.info("<> Очистка ресурсов...")
         
+        if self._hunter_startup:
+            self._hunter_startup.cancel()
+            await asyncio.gather(self._hunter_startup, return_exceptions=True)
+        
         if self.monitor:
             await self.monitor.stop()
         
@@ -120,6 +146,7 @@ class GiftSniperApp:
         )
         
         logger.info("✓ Завершение работы")
+        await logger.complete()
     
 
     def handle_signal(self, signum, frame) -> None:
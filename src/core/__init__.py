@@ -1,4 +1,10 @@
-from .models import GiftCriteria, PurchaseDecision, GiftData, HunterStats, MonitorStats
+from .models import (
+    GiftCriteria, PurchaseDecision, GiftData, CatalogSnapshot, PlannedPurchase, PreparedPayment, UnitResult, PurchaseResult,
+    GiftFoundEvent, PurchaseSucceededEvent, PurchaseFailedEvent,
+    GiftAddedEvent, GiftSupplyDecreasedEvent, GiftPriceChangedEvent, GiftSoldOutEvent, GiftRemovedEvent,
+    TraceSpan, GiftTrace, TtfpStats, ReplayGiftResult, ReplayReport, LoopStall, LoopStats, DropWindow,
+    HunterStats, MonitorStats, SchedulerStats, StageStats
+)
 from .constants import TimeConstants, Limits, FileConstants, TelegramConstants, AppInfo
 from .exceptions import (
     GiftSniperError, ConfigurationError, AuthenticationError, 
@@ -10,8 +16,31 @@ __all__ = [
     "GiftCriteria", 
     "PurchaseDecision", 
     "GiftData", 
+    "CatalogSnapshot",
+    "PlannedPurchase",
+    "PreparedPayment",
+    "UnitResult",
+    "PurchaseResult",
+    "GiftFoundEvent",
+    "PurchaseSucceededEvent",
+    "PurchaseFailedEvent",
+    "GiftAddedEvent",
+    "GiftSupplyDecreasedEvent",
+    "GiftPriceChangedEvent",
+    "GiftSoldOutEvent",
+    "GiftRemovedEvent",
+    "TraceSpan",
+    "GiftTrace",
+    "TtfpStats",
+    "ReplayGiftResult",
+    "ReplayReport",
+    "LoopStall",
+    "LoopStats",
+    "DropWindow",
     "HunterStats", 
     "MonitorStats",
+    "SchedulerStats",
+    "StageStats",
 
     "TimeConstants", 
     "Limits", 
@@ -1,14 +1,60 @@
 class TimeConstants:
     GIFT_CHECK_TIMEOUT = 10.0
-    HUNTER_INITIAL_DELAY_MAX = 2.0
-    QUEUE_PROCESS_DELAY = 0.5
+    HUNTER_MIN_SPACING_RATIO = 0.8
+    SLOT_JITTER_RATIO = 0.1
     POST_ERROR_DELAY = 5.0
+    STATE_FLUSH_INTERVAL = 1.0
+    PEER_REFRESH_DELAY = 5.0
+    BALANCE_RECONCILE_INTERVAL = 60.0
+    BALANCE_RECONCILE_RETRY = 1.0
+    PIPELINE_DRAIN_TIMEOUT = 30.0
+    PIPELINE_RATE_WINDOW = 60.0
+    NOTIFICATION_DIGEST_WINDOW = 2.0
+    NOTIFICATION_DRAIN_TIMEOUT = 10.0
+    LOOP_LAG_PROBE_INTERVAL = 0.5
+    METRICS_REQUEST_TIMEOUT = 5.0
+    RECORDING_FLUSH_INTERVAL = 1.0
+    REPLAY_TAIL = 30.0
+    CLIENT_START_TIMEOUT = 60.0
+    POLL_INTERVAL_MAX = 60.0
+    POLL_RATE_INCREASE = 0.002
+    POLL_RATE_DECREASE = 0.5
+    POLL_RATE_PERSIST_STEP = 0.1
+    POLL_PAUSE_MAX = 5.0
+    DROP_WINDOW_MARGIN = 1800.0
+    DROP_MERGE_WINDOW = 600.0
+    DROP_BURST_HOLD = 900.0
+    POLL_MODE_CHECK_INTERVAL = 30.0
+    BURST_INTERVAL_RATIO = 0.5
+    SUPPLY_RATE_WINDOW = 10.0
+    SUPPLY_LATENCY_SMOOTHING = 0.2
+    SUPPLY_ADMIT_TIMEOUT = 5.0
 
 
 class Limits:
     MAX_PROCESSED_GIFTS = 1000
     GC_COLLECTION_INTERVAL = 50
     MAX_UPDATE_QUANTITY = 9999
+    SCHEDULER_GAP_SAMPLES = 500
+    HUNTER_MAX_CONSECUTIVE_ERRORS = 3
+    STATE_FLUSH_BATCH = 256
+    STATE_COMPACT_THRESHOLD = 10000
+    EVENT_QUEUE_SIZE = 1000
+    PIPELINE_QUEUE_SIZE = 64
+    PIPELINE_PURCHASE_WORKERS = 8
+    PIPELINE_LATENCY_SAMPLES = 500
+    NOTIFICATION_DIGEST_BACKLOG = 10
+    TRACE_RING_SIZE = 256
+    TRACE_MAX_SPANS = 200
+    HISTOGRAM_MIN_VALUE = 0.0001
+    HISTOGRAM_SUB_BUCKETS = 2
+    HISTOGRAM_BUCKETS = 40
+    RECORDING_FLUSH_BATCH = 512
+    LOOP_LAG_SAMPLES = 500
+    LOOP_STALL_HISTORY = 50
+    LOOP_STACK_DEPTH = 12
+    DROP_WINDOW_MIN_SUPPORT = 2
+    DROP_HISTORY_DAYS = 60
 
 
 class FileConstants:
@@ -18,12 +64,29 @@ class FileConstants:
     LOG_FILE_PATTERN = "gift_sniper_{time:YYYY-MM-DD}.log"
     LOG_RETENTION_DAYS = 7
     CREDENTIALS_FILE_PERMISSIONS = 0o600
+    STATE_DIR = "state"
+    STATE_FILE = "sniper_state.jsonl"
+    TRACE_FILE = "gift_traces.jsonl"
+    RECORDING_FILE_PATTERN = "session_{time}.jsonl"
 
 
 class TelegramConstants:
     API_HASH_LENGTH = 32
     ERROR_INSUFFICIENT_BALANCE = "STARS_BALANCE_INSUFFICIENT"
     ERROR_GIFT_SOLD_OUT = "GIFT_SOLD_OUT"
+    SOLD_OUT_ERRORS = ("GIFT_SOLD_OUT", "STARGIFT_SOLD_OUT", "STARGIFT_USAGE_LIMITED")
+    CATALOG_HASH_MODES = ("off", "hunter", "shared")
+    PEER_INVALID_ERRORS = (
+        "PEER_ID_INVALID", "USERNAME_INVALID", "USERNAME_NOT_OCCUPIED",
+        "CHANNEL_INVALID", "CHANNEL_PRIVATE"
+    )
+    PEER_REFRESH_ATTEMPTS = 5
+    PAYMENT_FORM_ERRORS = ("FORM_EXPIRED", "FORM_ID_EMPTY", "FORM_UNSUPPORTED")
+    BOT_PRIVATE_CHAT_RATE = 1.0
+    BOT_GROUP_CHAT_RATE = 20 / 60
+    BOT_BURST = 3
+    DIGEST_MAX_LENGTH = 4000
+    DIGEST_SEPARATOR = "\n\n— — —\n\n"
 
 
 class AppInfo:
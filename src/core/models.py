@@ -1,5 +1,6 @@
-from dataclasses import dataclass
-from typing import Optional, Any
+import re
+from dataclasses import dataclass, field
+from typing import Optional, Any, Dict, List
 from datetime import datetime
 
 
@@ -10,7 +11,7 @@ class GiftCriteria:
     min_price: int
     max_price: int
     quantity: int
-
+    
     def matches(self, supply: int, price: int) -> bool:
         return (self.min_supply <= supply <= self.max_supply and 
                 self.min_price <= price <= self.max_price)
@@ -22,6 +23,7 @@ class PurchaseDecision:
     quantity: int = 0
     matched_criteria: Optional[GiftCriteria] = None
     reason: str = ""
+    priority: int = 0
 
 
 @dataclass
@@ -45,6 +47,178 @@ class GiftData:
             available_amount=gift.available_amount,
             can_upgrade=gift.can_upgrade
         )
+    
+    @classmethod
+    def from_raw_star_gift(cls, star_gift: Any) -> 'GiftData':
+        return cls(
+            id=star_gift.id,
+            price=star_gift.stars,
+            is_limited=bool(star_gift.limited),
+            is_sold_out=bool(star_gift.sold_out),
+            total_amount=star_gift.availability_total,
+            available_amount=star_gift.availability_remains,
+            can_upgrade=star_gift.upgrade_stars is not None
+        )
+
+
+@dataclass
+class CatalogSnapshot:
+    hunter_id: int
+    generation: int
+    gifts: List[GiftData]
+    fetch_started: float = 0.0
+    fetch_finished: float = 0.0
+    sent_at: float = 0.0
+
+
+@dataclass
+class PlannedPurchase:
+    gift: GiftData
+    decision: PurchaseDecision
+    allocations: Dict[int, int] = field(default_factory=dict)
+    
+    @property
+    def quantity(self) -> int:
+        return sum(self.allocations.values())
+
+
+@dataclass
+class PreparedPayment:
+    target: str
+    invoice: Any
+    form_id: int
+    form_latency: float
+    rpc_count: int = 1
+
+
+@dataclass
+class UnitResult:
+    index: int
+    target: str
+    success: bool
+    latency: float
+    error: str = ""
+    form_latency: float = 0.0
+    rpc_count: int = 0
+
+
+@dataclass
+class PurchaseResult:
+    gift_id: int
+    requested: int
+    bought: int = 0
+    last_error: str = ""
+    stop_reason: str = ""
+    units: List[UnitResult] = field(default_factory=list)
+    unused_form_rpc: int = 0
+    
+    @property
+    def success(self) -> bool:
+        return self.bought > 0
+    
+    @property
+    def wasted_rpc(self) -> int:
+        return max(0, sum(unit.rpc_count for unit in self.units) + self.unused_form_rpc - 2 * self.bought)
+    
+    @property
+    def rpc_per_unit(self) -> float:
+        successful = [unit for unit in self.units if unit.success]
+        return sum(unit.rpc_count for unit in self.units) / len(successful) if successful else 0.0
+    
+    @property
+    def avg_unit_latency(self) -> float:
+        successful = [unit.latency for unit in self.units if unit.success]
+        return sum(successful) / len(successful) if successful else 0.0
+    
+    @property
+    def message(self) -> str:
+        if self.bought > 0:
+            return f"Куплено {self.bought}/{self.requested}"
+        return self.last_error or self.stop_reason
+
+
+@dataclass
+class GiftFoundEvent:
+    gift: GiftData
+
+
+@dataclass
+class GiftAddedEvent:
+    gift: GiftData
+    observed_at: float = 0.0
+
+
+@dataclass
+class GiftSupplyDecreasedEvent:
+    gift_id: int
+    previous: int
+    available: int
+    total: int
+    observed_at: float = 0.0
+
+
+@dataclass
+class GiftPriceChangedEvent:
+    gift_id: int
+    previous: int
+    price: int
+    observed_at: float = 0.0
+
+
+@dataclass
+class GiftSoldOutEvent:
+    gift_id: int
+    observed_at: float = 0.0
+
+
+@dataclass
+class GiftRemovedEvent:
+    gift_id: int
+    observed_at: float = 0.0
+
+
+@dataclass
+class PurchaseSucceededEvent:
+    gift_id: int
+    quantity: int
+    total_spent: int
+
+
+@dataclass
+class PurchaseFailedEvent:
+    gift_id: int
+    error: str
+
+
+@dataclass
+class TraceSpan:
+    name: str
+    start: float
+    end: float
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class GiftTrace:
+    gift_id: int
+    origin: float
+    spans: List[TraceSpan] = field(default_factory=list)
+    first_success: Optional[float] = None
+    dropped_spans: int = 0
+    
+    @property
+    def time_to_first_purchase(self) -> Optional[float]:
+        if self.first_success is None:
+            return None
+        return self.first_success - self.origin
+
+
+@dataclass
+class TtfpStats:
+    samples: int
+    p50: float
+    p95: float
+    p99: float
 
 
 @dataclass
@@ -53,6 +227,106 @@ class HunterStats:
     last_check: Optional[datetime]
     check_count: int
     known_gifts: int
+    not_modified_checks: int = 0
+
+
+@dataclass
+class SchedulerStats:
+    active_hunters: int
+    suspended_hunters: int
+    target_gap: float
+    gap_samples: int
+    gap_p50: float
+    gap_p95: float
+    gap_max: float
+    mode: str = "normal"
+
+
+@dataclass
+class DropWindow:
+    start: int
+    end: int
+    weekday: Optional[int] = None
+    support: int = 0
+    manual: bool = False
+    
+    WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+    PATTERN = re.compile(r"^(?:(mon|tue|wed|thu|fri|sat|sun)\s+)?(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})$")
+    
+    @classmethod
+    def parse(cls, entry: str) -> 'DropWindow':
+        match = cls.PATTERN.match(entry.strip().lower())
+        if not match:
+            raise ValueError(f"неверный формат окна {entry!r}, ожидается \"14:00-15:30\" или \"fri 14:00-15:30\"")
+        
+        weekday, start_hour, start_minute, end_hour, end_minute = match.groups()
+        start = int(start_hour) * 3600 + int(start_minute) * 60
+        end = int(end_hour) * 3600 + int(end_minute) * 60
+        if start >= 86400 or end > 86400 or int(start_minute) >= 60 or int(end_minute) >= 60 or start == end:
+            raise ValueError(f"неверное время окна {entry!r}")
+        
+        return cls(
+            start=start,
+            end=end,
+            weekday=cls.WEEKDAYS.index(weekday) if weekday else None,
+            manual=True
+        )
+    
+    def contains(self, timestamp: float) -> bool:
+        second = timestamp % 86400
+        weekday = int(timestamp // 86400 + 3) % 7
+        
+        if self.start <= self.end:
+            inside = self.start <= second < self.end
+        elif second < self.end:
+            inside, weekday = True, (weekday - 1) % 7
+        else:
+            inside = second >= self.start
+        
+        return inside and (self.weekday is None or weekday == self.weekday)
+    
+    @property
+    def label(self) -> str:
+        prefix = f"{self.WEEKDAYS[self.weekday]} " if self.weekday is not None else ""
+        return (
+            f"{prefix}{self.start // 3600:02d}:{self.start % 3600 // 60:02d}-"
+            f"{self.end // 3600:02d}:{self.end % 3600 // 60:02d}"
+        )
+
+
+@dataclass
+class StageStats:
+    name: str
+    depth: int
+    capacity: int
+    in_flight: int
+    processed: int
+    failed: int
+    latency_p50: float
+    latency_p95: float
+    throughput: float
+
+
+@dataclass
+class LoopStall:
+    started_at: float
+    duration: float = 0.0
+    during_purchase: bool = False
+    samples: int = 0
+    location: str = ""
+    stack: List[str] = field(default_factory=list)
+
+
+@dataclass
+class LoopStats:
+    lag_samples: int
+    lag_p50: float
+    lag_p95: float
+    lag_max: float
+    stalls: int
+    purchase_stalls: int
+    worst_stall: float
+    last_stall: Optional[LoopStall] = None
 
 
 @dataclass
@@ -62,4 +336,39 @@ class MonitorStats:
     buyer_balance: int
     total_checks: int
     hunters: list[HunterStats]
-    
\ No newline at end of file
+    scheduler: Optional[SchedulerStats] = None
+    pipeline: List[StageStats] = field(default_factory=list)
+    ttfp: Optional[TtfpStats] = None
+    loop: Optional[LoopStats] = None
+
+
+@dataclass
+class ReplayGiftResult:
+    gift_id: int
+    appeared_at: Optional[float]
+    detected_at: Optional[float] = None
+    first_purchase_at: Optional[float] = None
+    bought: int = 0
+    
+    @property
+    def detection_delay(self) -> Optional[float]:
+        if self.appeared_at is None or self.detected_at is None:
+            return None
+        return self.detected_at - self.appeared_at
+    
+    @property
+    def purchase_delay(self) -> Optional[float]:
+        if self.appeared_at is None or self.first_purchase_at is None:
+            return None
+        return self.first_purchase_at - self.appeared_at
+
+
+@dataclass
+class ReplayReport:
+    duration: float
+    wall_time: float
+    checks: int
+    rpc_calls: int
+    bought: int
+    spent: int
+    gifts: List[ReplayGiftResult] = field(default_factory=list)
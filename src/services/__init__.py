@@ -1,14 +1,20 @@
 from .buyer import GiftBuyer
 from .hunter import GiftHunter
+from .ledger import StarsLedger
 from .monitor import GiftMonitor
 from .purchase_manager import PurchaseManager
+from .state_store import StateStore
 from .stats_manager import StatsManager
+from .watchdog import LoopWatchdog
 
 
 __all__ = [
     "GiftBuyer", 
     "GiftHunter", 
     "GiftMonitor", 
+    "LoopWatchdog",
     "PurchaseManager", 
+    "StarsLedger",
+    "StateStore",
     "StatsManager"
 ]
@@ -1,30 +1,51 @@
 import asyncio
-from typing import Tuple, List
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple, List
 
-from pyrogram import Client
+from pyrogram import Client, raw
 from pyrogram.errors import RPCError, FloodWait
 
 import config
-from src.utils import logger
+from src.utils import logger, metrics, clock
 from src.core.constants import TimeConstants, TelegramConstants
+from src.core.models import PreparedPayment, PurchaseResult, UnitResult
+from src.services.cancellation import CancelToken
+from src.services.ledger import Reservation, StarsLedger
+from src.services.purchase_window import PurchaseWindow
+from src.services.poll_gate import PollGate
+from src.services.supply_tracker import SupplyTracker, STOP_SUPPLY_DEPLETED
+from src.services.tracing import Tracer
 
 
 class GiftBuyer:
     
-    def __init__(self, client: Client, target_usernames: List[str], buyer_id: int = 0):
+    def __init__(self, client: Client, target_usernames: List[str], buyer_id: int = 0,
+                 tracer: Optional[Tracer] = None, gate: Optional[PollGate] = None):
         self.client = client
         self.buyer_id = buyer_id
+        self.tracer = tracer or Tracer()
+        self.session_name = Path(str(getattr(client, 'name', buyer_id))).name
+        self.gate = gate or PollGate(self.session_name)
         self.target_usernames = [username.lstrip('@') for username in target_usernames]
-        self._stars_balance: int = 0
         self._current_index: int = buyer_id % len(target_usernames) if target_usernames else 0
+        self._peers: Dict[str, raw.base.InputPeer] = {}
+        self._refreshing: Set[str] = set()
+        self._invoices: Dict[Tuple[str, int], raw.types.InputInvoiceStarGift] = {}
+        self.window = PurchaseWindow(
+            initial=config.PURCHASE_WINDOW,
+            maximum=config.PURCHASE_WINDOW_MAX,
+            owner=f"Buyer-{buyer_id}"
+        )
+        self.ledger = StarsLedger(self._fetch_balance, owner=f"Buyer-{buyer_id}")
     
-    
+
     async def initialize(self) -> bool:
         try:
-            self._stars_balance = await self.client.get_stars_balance()
+            self.ledger.reset(await self._fetch_balance())
+            await self._resolve_targets()
             logger.info(
-                f"[Buyer-{self.buyer_id}] Инициализирован. Целей: {len(self.target_usernames)}, "
-                f"Баланс: {self._stars_balance} Stars"
+                f"[Buyer-{self.buyer_id}] Инициализирован. Целей: {len(self._peers)}/{len(self.target_usernames)}, "
+                f"Баланс: {self.ledger.balance} Stars"
             )
             return True
         except Exception as e:
@@ -32,86 +53,484 @@ class GiftBuyer:
             return False
     
 
-    async def get_balance(self) -> int:
+    async def _fetch_balance(self) -> int:
+        async with self.gate.call("get_stars_balance"):
+            return await self.client.get_stars_balance()
+    
+
+    async def _resolve_targets(self) -> None:
+        for username in self.target_usernames:
+            try:
+                async with self.gate.call("resolve_peer"):
+                    self._peers[username] = await self.client.resolve_peer(username)
+            except FloodWait as e:
+                logger.warning(f"[Buyer-{self.buyer_id}] FloodWait при поиске {username}: {e.value} сек")
+                self._schedule_refresh(username, delay=e.value)
+            except Exception as e:
+                logger.error(f"[Buyer-{self.buyer_id}] Не удалось найти цель {username}: {e}")
+                self._schedule_refresh(username)
+    
+
+    def _schedule_refresh(self, username: str, delay: float = 0) -> None:
+        self._peers.pop(username, None)
+        
+        if username not in self._refreshing:
+            self._refreshing.add(username)
+            asyncio.create_task(self._refresh_peer(username, delay))
+    
+
+    async def _refresh_peer(self, username: str, delay: float) -> None:
         try:
-            self._stars_balance = await self.client.get_stars_balance()
-            return self._stars_balance
-        except Exception as e:
-            logger.error(f"[Buyer-{self.buyer_id}] Ошибка получения баланса: {e}")
-            return self._stars_balance
+            for attempt in range(TelegramConstants.PEER_REFRESH_ATTEMPTS):
+                await asyncio.sleep(delay or TimeConstants.PEER_REFRESH_DELAY * attempt)
+                delay = 0
+                
+                try:
+                    async with self.gate.call("resolve_peer"):
+                        self._peers[username] = await self.client.resolve_peer(username)
+                    logger.info(f"[Buyer-{self.buyer_id}] Цель {username} обновлена")
+                    return
+                except FloodWait as e:
+                    delay = e.value
+                except Exception as e:
+                    logger.debug(f"[Buyer-{self.buyer_id}] Повторный поиск {username} не удался: {e}")
+            
+            logger.error(f"[Buyer-{self.buyer_id}] Цель {username} недоступна, исключена из ротации")
+        finally:
+            self._refreshing.discard(username)
     
 
-    async def buy_gift(self, gift_id: int, quantity: int = 1) -> Tuple[bool, str]:
-        if not self.target_usernames:
-            return False, "Цели не инициализированы"
+    def _next_target(self) -> Optional[Tuple[str, raw.base.InputPeer]]:
+        for _ in range(len(self.target_usernames)):
+            username = self.target_usernames[self._current_index]
+            self._current_index = (self._current_index + 1) % len(self.target_usernames)
+            
+            peer = self._peers.get(username)
+            if peer is not None:
+                return username, peer
         
-        success_count = 0
-        last_error = ""
+        return None
+    
+
+    def _is_peer_error(self, error: Exception) -> bool:
+        return any(code in str(error) for code in TelegramConstants.PEER_INVALID_ERRORS)
+    
+
+    def _invoice(self, username: str, peer: raw.base.InputPeer, gift_id: int) -> raw.types.InputInvoiceStarGift:
+        key = (username, gift_id)
+        invoice = self._invoices.get(key)
         
-        for i in range(quantity):
-            try:
-                target = self.target_usernames[self._current_index]
-                self._current_index = (self._current_index + 1) % len(self.target_usernames)
-                
-                await self.client.send_gift(
-                    chat_id=target,
-                    gift_id=gift_id,
-                    hide_my_name=True
+        if invoice is None or invoice.peer is not peer:
+            invoice = raw.types.InputInvoiceStarGift(
+                peer=peer,
+                gift_id=gift_id,
+                hide_name=True
+            )
+            self._invoices[key] = invoice
+        
+        return invoice
+    
+
+    async def _prepare(self, target: Tuple[str, raw.base.InputPeer], gift_id: int) -> PreparedPayment:
+        username, peer = target
+        invoice = self._invoice(username, peer, gift_id)
+        
+        started = clock.monotonic()
+        try:
+            async with self.gate.call("get_payment_form"):
+                form = await self.client.invoke(
+                    raw.functions.payments.GetPaymentForm(invoice=invoice)
                 )
-                success_count += 1
-                logger.success(
-                    f"[Buyer-{self.buyer_id}] Подарок {gift_id} отправлен на {target} ({i+1}/{quantity})"
+        finally:
+            self.tracer.span(gift_id, "form", started, buyer=self.buyer_id, target=username)
+        
+        return PreparedPayment(
+            target=username,
+            invoice=invoice,
+            form_id=form.form_id,
+            form_latency=clock.monotonic() - started
+        )
+    
+
+    async def _pay(self, prepared: PreparedPayment) -> None:
+        started = clock.monotonic()
+        try:
+            async with self.gate.call("send_gift"):
+                await self.client.invoke(
+                    raw.functions.payments.SendStarsForm(form_id=prepared.form_id, invoice=prepared.invoice)
                 )
-                
-                if i < quantity - 1:
-                    await asyncio.sleep(config.PURCHASE_DELAY)
+        finally:
+            self.tracer.span(
+                prepared.invoice.gift_id, "pay", started, buyer=self.buyer_id, target=prepared.target
+            )
+    
+
+    def _handle_rpc_error(self, error: RPCError, username: str, result: PurchaseResult,
+                          cancel: CancelToken) -> None:
+        logger.error(f"[Buyer-{self.buyer_id}] RPC ошибка при покупке: {error}")
+        
+        if TelegramConstants.ERROR_INSUFFICIENT_BALANCE in str(error):
+            logger.error(f"[Buyer-{self.buyer_id}] Недостаточно Stars!")
+            result.stop_reason = TelegramConstants.ERROR_INSUFFICIENT_BALANCE
+            self.ledger.invalidate()
+        elif self._is_sold_out(error):
+            logger.error(f"[Buyer-{self.buyer_id}] Подарок распродан!")
+            result.stop_reason = TelegramConstants.ERROR_GIFT_SOLD_OUT
+            cancel.cancel(TelegramConstants.ERROR_GIFT_SOLD_OUT)
+        elif self._is_peer_error(error):
+            logger.warning(f"[Buyer-{self.buyer_id}] Цель {username} недействительна, обновляем в фоне")
+            self._schedule_refresh(username)
+    
+
+    def _is_sold_out(self, error: Exception) -> bool:
+        return any(code in str(error) for code in TelegramConstants.SOLD_OUT_ERRORS)
+    
+
+    def _unit_outcome(self, error: str, cancel: CancelToken) -> str:
+        if not error:
+            return "success"
+        if cancel.cancelled and error == cancel.reason:
+            return "cancelled"
+        if self._is_sold_out(error):
+            return "sold_out"
+        if "FLOOD_WAIT" in error:
+            return "flood_wait"
+        return "failed"
+    
+
+    def _is_form_error(self, error: Exception) -> bool:
+        return any(code in str(error) for code in TelegramConstants.PAYMENT_FORM_ERRORS)
+    
+
+    async def buy_gift(self, gift_id: int, quantity: int = 1,
+                       reservation: Optional[Reservation] = None,
+                       cancel: Optional[CancelToken] = None,
+                       supply: Optional[SupplyTracker] = None) -> PurchaseResult:
+        async with self.gate.purchasing():
+            return await self._buy_gift(gift_id, quantity, reservation, cancel, supply)
+    
+
+    async def _buy_gift(self, gift_id: int, quantity: int, reservation: Optional[Reservation],
+                        cancel: Optional[CancelToken], supply: Optional[SupplyTracker]) -> PurchaseResult:
+        result = PurchaseResult(gift_id=gift_id, requested=quantity)
+        cancel = cancel or CancelToken(f"Buyer-{self.buyer_id}")
+        
+        if not self.target_usernames:
+            result.last_error = "Цели не инициализированы"
+            if reservation:
+                reservation.release()
+            return result
+        
+        pending: Set[asyncio.Task] = set()
+        forms = None
+        if config.PAYMENT_FORM_PREFETCH > 0:
+            forms = PaymentFormPipeline(
+                self, gift_id, quantity, config.PAYMENT_FORM_PREFETCH, result, cancel, supply
+            )
+        
+        try:
+            for index in range(quantity):
+                if forms:
+                    prepared = await forms.next()
+                    target = None
+                    if prepared is None:
+                        break
+                else:
+                    prepared = None
+                    target = self._next_target()
+                    if target is None:
+                        result.last_error = "Нет доступных целей"
+                        logger.error(f"[Buyer-{self.buyer_id}] {result.last_error}")
+                        break
                     
-            except FloodWait as e:
-                logger.warning(f"[Buyer-{self.buyer_id}] FloodWait: {e.value} сек")
-                await asyncio.sleep(e.value)
+                    if supply and not await self._admit(supply, gift_id, cancel):
+                        if not cancel.cancelled:
+                            result.stop_reason = STOP_SUPPLY_DEPLETED
+                        break
+                
+                await self.window.acquire()
+                
+                if result.stop_reason or cancel.cancelled:
+                    self.window.release()
+                    if prepared:
+                        forms.discard(prepared)
+                    elif supply:
+                        supply.settle(gift_id, landed=False)
+                    break
+                
+                task = cancel.register(asyncio.create_task(
+                    self._buy_unit(gift_id, index, result, cancel, prepared, target, reservation, supply)
+                ))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                
+                if index < quantity - 1 and config.PURCHASE_DELAY > 0:
+                    await cancel.sleep(config.PURCHASE_DELAY / self.window.size)
+            
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            if forms:
+                await forms.close()
+            if reservation:
+                reservation.release()
+            else:
+                self.ledger.invalidate()
+        
+        if cancel.cancelled and not result.stop_reason:
+            result.stop_reason = cancel.reason
+        
+        if result.stop_reason == STOP_SUPPLY_DEPLETED:
+            logger.info(
+                f"[Buyer-{self.buyer_id}] Подарок {gift_id} закончится раньше, чем дойдут новые покупки, "
+                f"остаток не отправляем"
+            )
+        
+        logger.info(
+            f"[Buyer-{self.buyer_id}] Подарок {gift_id}: куплено {result.bought}/{quantity}, "
+            f"окно {self.window.size}, RPC на подарок {result.rpc_per_unit:.2f}, "
+            f"задержка покупки {result.avg_unit_latency * 1000:.0f} мс"
+        )
+        return result
+    
+
+    async def _admit(self, supply: SupplyTracker, gift_id: int, cancel: CancelToken) -> bool:
+        admission = cancel.register(asyncio.create_task(supply.admit(gift_id)))
+        try:
+            return await admission
+        except asyncio.CancelledError:
+            if not cancel.cancelled:
+                raise
+            return False
+    
+
+    async def _buy_unit(self, gift_id: int, index: int, result: PurchaseResult, cancel: CancelToken,
+                        prepared: Optional[PreparedPayment] = None,
+                        target: Optional[Tuple[str, raw.base.InputPeer]] = None,
+                        reservation: Optional[Reservation] = None,
+                        supply: Optional[SupplyTracker] = None) -> None:
+        started = clock.monotonic()
+        username = prepared.target if prepared else target[0]
+        rpc_count = prepared.rpc_count if prepared else 0
+        form_latency = prepared.form_latency if prepared else 0.0
+        error = ""
+        holding = True
+        landed = False
+        
+        try:
+            for attempt in range(2):
                 try:
-                    target = self.target_usernames[self._current_index]
-                    self._current_index = (self._current_index + 1) % len(self.target_usernames)
-                    await self.client.send_gift(
-                        chat_id=target,
-                        gift_id=gift_id,
-                        hide_my_name=True
-                    )
-                    success_count += 1
-                except Exception as retry_error:
-                    last_error = str(retry_error)
-                    logger.error(f"[Buyer-{self.buyer_id}] Повторная ошибка: {retry_error}")
+                    if prepared is None:
+                        rpc_count += 1
+                        prepared = await self._prepare(target, gift_id)
+                        form_latency = prepared.form_latency
                     
-            except RPCError as e:
-                last_error = str(e)
-                logger.error(f"[Buyer-{self.buyer_id}] RPC ошибка при покупке: {e}")
+                    rpc_count += 1
+                    await self._pay(prepared)
+                    error = ""
+                    result.bought += 1
+                    self.tracer.success(gift_id)
+                    if reservation:
+                        reservation.commit()
+                    landed = True
+                    self.window.on_success()
+                    logger.success(
+                        f"[Buyer-{self.buyer_id}] Подарок {gift_id} отправлен на {username} "
+                        f"({index + 1}/{result.requested})"
+                    )
+                    break
+                
+                except FloodWait as e:
+                    error = str(e)
+                    self.window.on_flood_wait(e.value)
+                    if attempt == 0 and not cancel.cancelled:
+                        holding = False
+                        self.window.release()
+                        await asyncio.sleep(e.value)
+                        await self.window.acquire()
+                        holding = True
+                        continue
+                    logger.error(f"[Buyer-{self.buyer_id}] Повторная ошибка: {e}")
                 
-                if TelegramConstants.ERROR_INSUFFICIENT_BALANCE in str(e):
-                    logger.error(f"[Buyer-{self.buyer_id}] Недостаточно Stars!")
+                except RPCError as e:
+                    error = str(e)
+                    if attempt == 0 and self._is_form_error(e) and not cancel.cancelled:
+                        logger.debug(f"[Buyer-{self.buyer_id}] Форма оплаты устарела, запрашиваем новую")
+                        target = (username, prepared.invoice.peer)
+                        prepared = None
+                        continue
+                    self._handle_rpc_error(e, username, result, cancel)
+                
+                except Exception as e:
+                    error = str(e)
+                    logger.error(f"[Buyer-{self.buyer_id}] Неожиданная ошибка: {e}")
+                    self.ledger.invalidate()
+                
+                break
+        except asyncio.CancelledError:
+            if not cancel.cancelled:
+                raise
+            error = cancel.reason
+            self.ledger.invalidate()
+        finally:
+            if holding:
+                self.window.release()
+            if supply:
+                supply.settle(gift_id, landed, clock.monotonic() - started)
+        
+        if error:
+            result.last_error = error
+        metrics.inc("sniper_purchase_units_total", account=self.session_name, outcome=self._unit_outcome(error, cancel))
+        result.units.append(UnitResult(
+            index=index,
+            target=username,
+            success=not error,
+            latency=clock.monotonic() - started,
+            error=error,
+            form_latency=form_latency,
+            rpc_count=rpc_count
+        ))
+    
+
+    @property
+    def balance(self) -> int:
+        return self.ledger.balance
+    
+
+    @property
+    def available(self) -> int:
+        return self.ledger.available
+
+
+
+class PaymentFormPipeline:
+    
+    def __init__(self, buyer: GiftBuyer, gift_id: int, quantity: int, depth: int,
+                 result: PurchaseResult, cancel: CancelToken, supply: Optional[SupplyTracker] = None):
+        self.buyer = buyer
+        self.gift_id = gift_id
+        self.result = result
+        self.cancel = cancel
+        self.supply = supply
+        self._remaining = quantity
+        self._claims = 0
+        self._ready: asyncio.Queue = asyncio.Queue(maxsize=depth)
+        self._workers = [
+            cancel.register(asyncio.create_task(self._fetch_loop()))
+            for _ in range(min(depth, quantity))
+        ]
+        self._active = len(self._workers)
+    
+
+    async def next(self) -> Optional[PreparedPayment]:
+        if self._active == 0 and self._ready.empty():
+            return None
+        
+        prepared = await self._ready.get()
+        if prepared is None:
+            self._ready.put_nowait(None)
+        else:
+            self._claims -= 1
+        return prepared
+    
+
+    async def _fetch_loop(self) -> None:
+        try:
+            while self._remaining > 0 and not self.result.stop_reason and not self.cancel.cancelled:
+                target = self.buyer._next_target()
+                if target is None:
+                    self.result.last_error = "Нет доступных целей"
+                    logger.error(f"[Buyer-{self.buyer.buyer_id}] {self.result.last_error}")
                     break
-                elif TelegramConstants.ERROR_GIFT_SOLD_OUT in str(e):
-                    logger.error(f"[Buyer-{self.buyer_id}] Подарок распродан!")
+                
+                if self.supply and not await self.supply.admit(self.gift_id):
+                    self.result.stop_reason = STOP_SUPPLY_DEPLETED
                     break
-                    
+                
+                self._claims += 1
+                self._remaining -= 1
+                prepared = None
+                try:
+                    prepared = await self._fetch(target)
+                finally:
+                    if prepared is None:
+                        self._release()
+                
+                if prepared:
+                    try:
+                        await self._ready.put(prepared)
+                    except asyncio.CancelledError:
+                        self._release(prepared)
+                        raise
+        finally:
+            self._active -= 1
+            if self._active == 0 and not self._ready.full():
+                self._ready.put_nowait(None)
+    
+
+    async def _fetch(self, target: Tuple[str, raw.base.InputPeer]) -> Optional[PreparedPayment]:
+        username = target[0]
+        rpc_count = 0
+        
+        for attempt in range(2):
+            try:
+                rpc_count += 1
+                prepared = await self.buyer._prepare(target, self.gift_id)
+                prepared.rpc_count = rpc_count
+                return prepared
+            
+            except FloodWait as e:
+                self.buyer.window.on_flood_wait(e.value)
+                if attempt == 0:
+                    await asyncio.sleep(e.value)
+                    continue
+                error = str(e)
+            
+            except RPCError as e:
+                self.buyer._handle_rpc_error(e, username, self.result, self.cancel)
+                error = str(e)
+            
             except Exception as e:
-                last_error = str(e)
-                logger.error(f"[Buyer-{self.buyer_id}] Неожиданная ошибка: {e}")
+                logger.error(f"[Buyer-{self.buyer.buyer_id}] Ошибка получения формы оплаты: {e}")
+                error = str(e)
+            
+            break
         
-        await self.get_balance()
+        self.result.last_error = error
+        self.result.units.append(UnitResult(
+            index=-1,
+            target=username,
+            success=False,
+            latency=0.0,
+            error=error,
+            rpc_count=rpc_count
+        ))
+        return None
+    
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
         
-        if success_count > 0:
-            return True, f"Куплено {success_count}/{quantity}"
-        else:
-            return False, last_error
+        while not self._ready.empty():
+            prepared = self._ready.get_nowait()
+            if prepared:
+                self._release(prepared)
+        
+        while self._claims > 0:
+            self._release()
     
 
-    async def can_afford(self, price: int, quantity: int) -> bool:
-        total_cost = price * quantity
-        current_balance = await self.get_balance()
-        return current_balance >= total_cost
+    def _release(self, prepared: Optional[PreparedPayment] = None) -> None:
+        self._claims -= 1
+        if prepared:
+            self.discard(prepared)
+        elif self.supply:
+            self.supply.settle(self.gift_id, landed=False)
     
 
-    @property
-    def balance(self) -> int:
-        return self._stars_balance
-    
\ No newline at end of file
+    def discard(self, prepared: PreparedPayment) -> None:
+        self.result.unused_form_rpc += prepared.rpc_count
+        if self.supply:
+            self.supply.settle(self.gift_id, landed=False)
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Set
+
+from src.utils import logger
+
+
+class CancelToken:
+    
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.reason: str = ""
+        self._event = asyncio.Event()
+        self._tasks: Set[asyncio.Task] = set()
+    
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+    
+
+    def register(self, task: asyncio.Task) -> asyncio.Task:
+        if self.cancelled:
+            task.cancel()
+            return task
+        
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+    
+
+    def cancel(self, reason: str) -> None:
+        if self.cancelled:
+            return
+        
+        self.reason = reason
+        self._event.set()
+        
+        tasks = [task for task in self._tasks if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        
+        logger.warning(f"[{self.name}] Покупка остановлена ({reason}), отменено задач: {len(tasks)}")
+    
+
+    async def sleep(self, delay: float) -> bool:
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        return self.cancelled
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from pyrogram import raw
+
+
+class CatalogCache:
+
+    def __init__(self):
+        self.hash: int = 0
+
+
+    def request(self) -> "raw.functions.payments.GetStarGifts":
+        return raw.functions.payments.GetStarGifts(hash=self.hash)
+
+
+    def accept(self, response: "raw.base.payments.StarGifts") -> Optional[list]:
+        if isinstance(response, raw.types.payments.StarGiftsNotModified):
+            return None
+
+        self.hash = response.hash
+        return response.gifts
+
+
+    def reset(self) -> None:
+        self.hash = 0
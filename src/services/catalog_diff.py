@@ -0,0 +1,144 @@
+from array import array
+from typing import Dict, Iterable, List, Optional, Union
+
+from src.core.models import (
+    GiftData, GiftAddedEvent, GiftSupplyDecreasedEvent, GiftPriceChangedEvent, GiftSoldOutEvent, GiftRemovedEvent
+)
+
+
+CatalogEvent = Union[
+    GiftAddedEvent, GiftSupplyDecreasedEvent, GiftPriceChangedEvent, GiftSoldOutEvent, GiftRemovedEvent
+]
+
+EVENT_KINDS = {
+    GiftAddedEvent: "added",
+    GiftSupplyDecreasedEvent: "supply_decreased",
+    GiftPriceChangedEvent: "price_changed",
+    GiftSoldOutEvent: "sold_out",
+    GiftRemovedEvent: "removed"
+}
+
+SOLD_OUT = 1
+CAN_UPGRADE = 2
+
+
+class CatalogDiffEngine:
+    
+    def __init__(self, gifts: Iterable[GiftData] = ()):
+        self._index: Dict[int, int] = {}
+        self._ids = array('q')
+        self._prices = array('q')
+        self._totals = array('q')
+        self._available = array('q')
+        self._added_at = array('d')
+        self._seen = array('Q')
+        self._flags = bytearray()
+        self._columns = (
+            self._ids, self._prices, self._totals, self._available, self._added_at, self._seen, self._flags
+        )
+        self._epoch = 0
+        
+        for gift in gifts:
+            if gift.is_limited and gift.id not in self._index:
+                self._append(gift, 0.0)
+    
+
+    def __len__(self) -> int:
+        return len(self._ids)
+    
+
+    def __contains__(self, gift_id: int) -> bool:
+        return gift_id in self._index
+    
+
+    def get(self, gift_id: int) -> Optional[GiftData]:
+        slot = self._index.get(gift_id)
+        if slot is None:
+            return None
+        
+        return GiftData(
+            id=gift_id,
+            price=self._prices[slot],
+            is_limited=True,
+            is_sold_out=bool(self._flags[slot] & SOLD_OUT),
+            total_amount=self._totals[slot],
+            available_amount=self._available[slot],
+            can_upgrade=bool(self._flags[slot] & CAN_UPGRADE)
+        )
+    
+
+    def apply(self, gifts: Iterable[GiftData], observed_at: float = 0.0) -> List[CatalogEvent]:
+        self._epoch += 1
+        epoch = self._epoch
+        index, seen, available, prices, flags = self._index, self._seen, self._available, self._prices, self._flags
+        events: List[CatalogEvent] = []
+        visited = 0
+        
+        for gift in gifts:
+            if not gift.is_limited:
+                continue
+            
+            slot = index.get(gift.id)
+            if slot is None:
+                self._append(gift, observed_at)
+                events.append(GiftAddedEvent(gift, observed_at))
+                visited += 1
+                continue
+            
+            if seen[slot] == epoch:
+                continue
+            seen[slot] = epoch
+            visited += 1
+            
+            if gift.available_amount < available[slot]:
+                events.append(GiftSupplyDecreasedEvent(
+                    gift.id, available[slot], gift.available_amount, gift.total_amount, observed_at
+                ))
+                available[slot] = gift.available_amount
+            
+            if gift.price != prices[slot]:
+                events.append(GiftPriceChangedEvent(gift.id, prices[slot], gift.price, observed_at))
+                prices[slot] = gift.price
+            
+            if gift.is_sold_out and not flags[slot] & SOLD_OUT:
+                flags[slot] |= SOLD_OUT
+                events.append(GiftSoldOutEvent(gift.id, observed_at))
+        
+        if visited < len(self._ids):
+            events.extend(self._remove_unseen(epoch, observed_at))
+        return events
+    
+
+    def _remove_unseen(self, epoch: int, observed_at: float) -> List[GiftRemovedEvent]:
+        removed = []
+        
+        for slot in range(len(self._ids) - 1, -1, -1):
+            if self._seen[slot] != epoch and self._added_at[slot] <= observed_at:
+                removed.append(GiftRemovedEvent(self._ids[slot], observed_at))
+                self._remove(slot)
+        
+        return removed
+    
+
+    def _append(self, gift: GiftData, observed_at: float) -> None:
+        self._index[gift.id] = len(self._ids)
+        self._ids.append(gift.id)
+        self._prices.append(gift.price)
+        self._totals.append(gift.total_amount)
+        self._available.append(gift.available_amount)
+        self._added_at.append(observed_at)
+        self._seen.append(self._epoch)
+        self._flags.append((SOLD_OUT if gift.is_sold_out else 0) | (CAN_UPGRADE if gift.can_upgrade else 0))
+    
+
+    def _remove(self, slot: int) -> None:
+        last = len(self._ids) - 1
+        del self._index[self._ids[slot]]
+        
+        if slot != last:
+            for column in self._columns:
+                column[slot] = column[last]
+            self._index[self._ids[slot]] = slot
+        
+        for column in self._columns:
+            column.pop()
@@ -0,0 +1,94 @@
+from typing import Dict, List, Optional, Tuple
+
+from src.core.models import CatalogSnapshot, GiftData, GiftAddedEvent, GiftRemovedEvent
+from src.services.catalog import CatalogCache
+from src.services.catalog_diff import CatalogDiffEngine, CatalogEvent
+from src.services.state_store import StateStore
+from src.utils import logger
+
+
+class DiscoveryRegistry:
+    
+    def __init__(self, store: Optional[StateStore] = None):
+        self.catalog = CatalogCache()
+        self.store = store
+        self.engine = CatalogDiffEngine(store.catalog_snapshot if store else ())
+        self._known: Dict[int, int] = {}
+        self._generation: int = 0
+        
+        if store:
+            self._known = dict.fromkeys(store.known_gifts, 0)
+            self.catalog.hash = store.catalog_hash
+    
+
+    def __contains__(self, gift_id: int) -> bool:
+        return gift_id in self._known
+    
+
+    def claim(self, gift_id: int) -> bool:
+        if gift_id in self._known:
+            return False
+        
+        self._generation += 1
+        self._known[gift_id] = self._generation
+        
+        if self.store:
+            self.store.record_known(gift_id)
+        return True
+    
+
+    def snapshot(self) -> int:
+        return self._generation
+    
+
+    def forget(self, gift_id: int, generation: int) -> None:
+        claimed_at = self._known.get(gift_id)
+        if claimed_at is None or claimed_at > generation:
+            return
+        
+        del self._known[gift_id]
+        if self.store:
+            self.store.forget_known(gift_id)
+    
+
+    def apply(self, snapshot: CatalogSnapshot) -> Tuple[List[GiftData], List[CatalogEvent]]:
+        events = self.engine.apply(snapshot.gifts, snapshot.sent_at)
+        new_limited_gifts = []
+        
+        for event in events:
+            if isinstance(event, GiftAddedEvent):
+                gift = event.gift
+                if gift.is_sold_out or not self.claim(gift.id):
+                    continue
+                
+                new_limited_gifts.append(gift)
+                logger.info(
+                    f"[Hunter-{snapshot.hunter_id}] Новый лимитированный подарок: "
+                    f"ID={gift.id}, Цена={gift.price}, Количество={gift.total_amount}"
+                )
+            elif isinstance(event, GiftRemovedEvent):
+                self.forget(event.gift_id, snapshot.generation)
+        
+        if events:
+            self.record_catalog(events)
+        return new_limited_gifts, events
+    
+
+    def record_catalog(self, events: List[CatalogEvent]) -> None:
+        if not self.store:
+            return
+        
+        changes: Dict[int, Optional[GiftData]] = {}
+        for event in events:
+            if isinstance(event, GiftRemovedEvent):
+                changes[event.gift_id] = None
+            elif isinstance(event, GiftAddedEvent):
+                changes[event.gift.id] = event.gift
+            else:
+                changes[event.gift_id] = self.engine.get(event.gift_id)
+        self.store.record_catalog(self.catalog.hash, changes)
+    
+
+    @property
+    def known_count(self) -> int:
+        return len(self._known)
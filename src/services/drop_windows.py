@@ -0,0 +1,109 @@
+from enum import Enum
+from typing import Iterable, List, Optional, Tuple
+
+from src.core.constants import TimeConstants, Limits
+from src.core.models import DropWindow, GiftAddedEvent
+from src.services.state_store import StateStore
+from src.utils import logger
+
+
+DAY = 86400
+
+
+class PollMode(Enum):
+    IDLE = "idle"
+    NORMAL = "normal"
+    BURST = "burst"
+
+
+def parse_schedule(entries: Iterable[str]) -> List[DropWindow]:
+    return [DropWindow.parse(entry) for entry in entries]
+
+
+class DropWindowPredictor:
+    
+    def __init__(self, schedule: Optional[List[DropWindow]] = None, store: Optional[StateStore] = None,
+                 margin: float = TimeConstants.DROP_WINDOW_MARGIN,
+                 min_support: int = Limits.DROP_WINDOW_MIN_SUPPORT):
+        self.schedule = schedule or []
+        self.store = store
+        self.margin = margin
+        self.min_support = min_support
+        self.drops: List[float] = sorted(store.drops) if store else []
+        self.windows: List[DropWindow] = []
+        self._needs_baseline = not (store and store.catalog)
+        self._baseline_at: Optional[float] = None
+        self._last_new: Optional[float] = None
+        self._refit()
+        
+        if self.windows:
+            logger.info(f"Окна дропов по истории: {', '.join(window.label for window in self.windows)} UTC")
+    
+
+    def observe_added(self, event: GiftAddedEvent, now: float) -> bool:
+        # Без сохраненного каталога первый снимок целиком приходит как новые подарки - это не дроп
+        if self._needs_baseline:
+            self._needs_baseline = False
+            self._baseline_at = event.observed_at
+        
+        if event.observed_at == self._baseline_at or event.gift.is_sold_out:
+            return False
+        
+        if self.drops and now - self.drops[-1] < TimeConstants.DROP_MERGE_WINDOW:
+            self._last_new = now
+        else:
+            self.record_drop(now)
+        return True
+    
+
+    def record_drop(self, timestamp: float) -> None:
+        self.drops.append(timestamp)
+        self._last_new = timestamp
+        if self.store:
+            self.store.record_drop(timestamp)
+        
+        self._refit(timestamp)
+        logger.info(f"Дроп записан в историю ({len(self.drops)}), окон выучено: {len(self.windows)}")
+    
+
+    def _refit(self, now: Optional[float] = None) -> None:
+        if now is None:
+            now = self.drops[-1] if self.drops else 0.0
+        
+        horizon = now - Limits.DROP_HISTORY_DAYS * DAY
+        points = sorted((timestamp % DAY, int(timestamp // DAY)) for timestamp in self.drops if timestamp >= horizon)
+        
+        windows = []
+        cluster: List[Tuple[float, int]] = []
+        for point in points:
+            if cluster and point[0] - cluster[-1][0] > self.margin:
+                windows.extend(self._window(cluster))
+                cluster = []
+            cluster.append(point)
+        windows.extend(self._window(cluster))
+        
+        self.windows = windows
+    
+
+    def _window(self, cluster: List[Tuple[float, int]]) -> List[DropWindow]:
+        support = len({day for _, day in cluster})
+        if not cluster or support < self.min_support:
+            return []
+        
+        return [DropWindow(
+            start=int(max(0.0, cluster[0][0] - self.margin)),
+            end=int(min(DAY, cluster[-1][0] + self.margin)),
+            support=support
+        )]
+    
+
+    def mode_at(self, timestamp: float) -> PollMode:
+        if self._last_new is not None and timestamp - self._last_new < TimeConstants.DROP_BURST_HOLD:
+            return PollMode.BURST
+        
+        if any(window.contains(timestamp) for window in self.schedule + self.windows):
+            return PollMode.BURST
+        
+        if not self.schedule and not self.windows:
+            return PollMode.NORMAL
+        return PollMode.IDLE
@@ -0,0 +1,79 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Type
+
+from src.core.constants import Limits
+from src.utils import logger, metrics
+
+
+EventHandler = Callable[[Any], Awaitable[None]]
+
+
+class EventBus:
+    
+    def __init__(self, max_pending: int = Limits.EVENT_QUEUE_SIZE):
+        self._handlers: Dict[Type, List[EventHandler]] = {}
+        self._pending: Deque[Any] = deque()
+        self._max_pending = max_pending
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+    
+
+    def subscribe(self, event_type: Type, handler: EventHandler) -> None:
+        self._handlers.setdefault(event_type, []).append(handler)
+    
+
+    def emit(self, event: Any) -> None:
+        if type(event) not in self._handlers:
+            return
+        
+        kind = type(event).__name__
+        if len(self._pending) >= self._max_pending:
+            metrics.inc("sniper_events_dropped_total", event=kind)
+            logger.warning(f"Очередь событий заполнена ({self._max_pending}), событие {kind} пропущено")
+            return
+        
+        self._pending.append(event)
+        metrics.inc("sniper_events_emitted_total", event=kind)
+        self._wakeup.set()
+    
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+    
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._dispatch_loop())
+    
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        
+        while self._pending:
+            await self._deliver(self._pending[0])
+            self._pending.popleft()
+    
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            
+            while self._pending:
+                await self._deliver(self._pending[0])
+                self._pending.popleft()
+    
+
+    async def _deliver(self, event: Any) -> None:
+        for handler in self._handlers.get(type(event), ()):
+            try:
+                await handler(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка обработки события {type(event).__name__}: {e}")
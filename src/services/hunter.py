@@ -1,41 +1,96 @@
 import asyncio
 import gc
+from pathlib import Path
 from typing import List, Optional
 from datetime import datetime
 
-from pyrogram import Client
+from pyrogram import Client, raw, types
 from pyrogram.errors import FloodWait, NetworkMigrate
 
-from src.utils import logger
+from src.utils import logger, clock
 from src.core.constants import TimeConstants, Limits
-from src.core.models import GiftData, HunterStats
+from src.core.models import CatalogSnapshot, GiftData, HunterStats
+from src.services.catalog import CatalogCache
+from src.services.discovery import DiscoveryRegistry
+from src.services.poll_gate import PollGate
 
 
 class GiftHunter:
     
-    def __init__(self, client: Client, hunter_id: int):
+    def __init__(self, client: Client, hunter_id: int,
+                 registry: Optional[DiscoveryRegistry] = None,
+                 catalog_cache: Optional[CatalogCache] = None,
+                 lean_decode: bool = True,
+                 gate: Optional[PollGate] = None):
         self.client = client
         self.hunter_id = hunter_id
+        self.account = Path(str(getattr(client, 'name', hunter_id))).name
+        self.gate = gate or PollGate(self.account)
+        self.registry = registry or DiscoveryRegistry()
+        self.catalog_cache = catalog_cache
+        self.lean_decode = lean_decode
         self._last_check: Optional[datetime] = None
-        self._known_gifts: set[int] = set()
         self._check_count: int = 0
+        self._not_modified_count: int = 0
+        self.sent_at: float = 0.0
     
 
-    async def check_gifts(self) -> List[GiftData]:
+    async def _fetch_gifts(self) -> Optional[List[GiftData]]:
+        if self.catalog_cache is None and not self.lean_decode:
+            async with self.gate.poll("get_available_gifts"):
+                self.sent_at = clock.monotonic()
+                gifts = await self.client.get_available_gifts()
+            return [GiftData.from_telegram_gift(gift) for gift in gifts]
+        
+        async with self.gate.poll("get_available_gifts"):
+            self.sent_at = clock.monotonic()
+            if self.catalog_cache is None:
+                response = await self.client.invoke(raw.functions.payments.GetStarGifts(hash=0))
+            else:
+                response = await self.client.invoke(self.catalog_cache.request())
+        
+        if self.catalog_cache is None:
+            raw_gifts = response.gifts
+        else:
+            raw_gifts = self.catalog_cache.accept(response)
+        
+        if raw_gifts is None:
+            self._not_modified_count += 1
+            return None
+        
+        return await self._decode(raw_gifts)
+    
+
+    async def _decode(self, raw_gifts: list) -> List[GiftData]:
+        if self.lean_decode:
+            return [
+                GiftData.from_raw_star_gift(gift) for gift in raw_gifts
+                if isinstance(gift, raw.types.StarGift) and gift.limited
+            ]
+        
+        return [
+            GiftData.from_telegram_gift(await types.Gift._parse_regular(self.client, gift))
+            for gift in raw_gifts if isinstance(gift, raw.types.StarGift)
+        ]
+    
+
+    async def fetch(self) -> Optional[CatalogSnapshot]:
         try:
             self._last_check = datetime.now()
             self._check_count += 1
-
+            
             if self._check_count % Limits.GC_COLLECTION_INTERVAL == 0:
                 gc.collect(0)
-                
+            
             logger.debug(f"[Hunter-{self.hunter_id}] Проверка #{self._check_count}")
             
+            generation = self.registry.snapshot()
+            fetch_started = clock.monotonic()
             gifts = None
             for attempt in range(2):
                 try:
                     gifts = await asyncio.wait_for(
-                        self.client.get_available_gifts(),
+                        self._fetch_gifts(),
                         timeout=TimeConstants.GIFT_CHECK_TIMEOUT
                     )
                     break
@@ -53,46 +108,31 @@ class GiftHunter:
                     else:
                         raise
             
-            if not gifts:
-                return []
-            
-            new_limited_gifts = []
-            current_limited_ids = set()
-            
-            for gift in gifts:
-                if not gift.is_limited:
-                    continue
-                    
-                current_limited_ids.add(gift.id)
-                
-                if gift.id not in self._known_gifts and not gift.is_sold_out:
-                    gift_data = GiftData.from_telegram_gift(gift)
-                    new_limited_gifts.append(gift_data)
-                    self._known_gifts.add(gift.id)
-                    
-                    logger.info(
-                        f"[Hunter-{self.hunter_id}] Новый лимитированный подарок: "
-                        f"ID={gift.id}, Цена={gift.price}, Количество={gift.total_amount}"
-                    )
-            
-            self._known_gifts = self._known_gifts.intersection(current_limited_ids)
-            
-            del gifts
-            
-            return new_limited_gifts
+            if gifts is None:
+                return None
             
+            return CatalogSnapshot(
+                hunter_id=self.hunter_id,
+                generation=generation,
+                gifts=gifts,
+                fetch_started=fetch_started,
+                fetch_finished=clock.monotonic(),
+                sent_at=self.sent_at
+            )
+        
         except FloodWait as e:
             logger.warning(f"[Hunter-{self.hunter_id}] FloodWait: {e.value} сек")
-            await asyncio.sleep(e.value)
-            return []
+            raise
         
         except asyncio.TimeoutError:
             logger.warning(f"[Hunter-{self.hunter_id}] Таймаут при получении подарков")
-            return []
-            
+            raise
+        
         except Exception as e:
             logger.error(f"[Hunter-{self.hunter_id}] Ошибка проверки подарков: {e}")
-            return []
+            if self.catalog_cache:
+                self.catalog_cache.reset()
+            raise
     
 
     def get_stats(self) -> HunterStats:
@@ -100,6 +140,6 @@ class GiftHunter:
             hunter_id=self.hunter_id,
             last_check=self._last_check,
             check_count=self._check_count,
-            known_gifts=len(self._known_gifts)
+            known_gifts=self.registry.known_count,
+            not_modified_checks=self._not_modified_count
         )
-    
\ No newline at end of file
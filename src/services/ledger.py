@@ -0,0 +1,144 @@
+import asyncio
+from typing import Awaitable, Callable, Optional, Set
+
+from src.core.constants import TimeConstants
+from src.utils import logger
+
+
+class Reservation:
+    
+    def __init__(self, ledger: "StarsLedger", price: int, quantity: int):
+        self.ledger = ledger
+        self.price = price
+        self.quantity = quantity
+        self.committed = 0
+    
+
+    @property
+    def held(self) -> int:
+        return (self.quantity - self.committed) * self.price
+    
+
+    def commit(self) -> None:
+        if self.committed >= self.quantity:
+            self.ledger.debit(self.price)
+            return
+        
+        self.committed += 1
+        self.ledger._reserved -= self.price
+        self.ledger.debit(self.price)
+    
+
+    def release(self) -> None:
+        if self.held > 0:
+            self.ledger._reserved -= self.held
+            self.quantity = self.committed
+        self.ledger._reservations.discard(self)
+
+
+
+class StarsLedger:
+    
+    def __init__(self, fetch_balance: Callable[[], Awaitable[int]], owner: str = "",
+                 interval: float = TimeConstants.BALANCE_RECONCILE_INTERVAL):
+        self.fetch_balance = fetch_balance
+        self.owner = owner
+        self.interval = interval
+        self._balance: int = 0
+        self._reserved: int = 0
+        self._reservations: Set[Reservation] = set()
+        self._version: int = 0
+        self._stale = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.reconcile_count: int = 0
+        self.drift_total: int = 0
+    
+
+    @property
+    def balance(self) -> int:
+        return self._balance
+    
+
+    @property
+    def reserved(self) -> int:
+        return self._reserved
+    
+
+    @property
+    def available(self) -> int:
+        return max(0, self._balance - self._reserved)
+    
+
+    def reset(self, balance: int) -> None:
+        self._balance = balance
+        self._version += 1
+    
+
+    def reserve(self, price: int, quantity: int) -> Reservation:
+        affordable = self.available // price if price > 0 else 0
+        reservation = Reservation(self, price, min(quantity, affordable))
+        
+        if reservation.quantity > 0:
+            self._reserved += reservation.held
+            self._reservations.add(reservation)
+        return reservation
+    
+
+    def debit(self, amount: int) -> None:
+        self._balance -= amount
+        self._version += 1
+    
+
+    def invalidate(self) -> None:
+        self._stale.set()
+    
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._reconcile_loop())
+    
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+
+    async def _reconcile_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._stale.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            
+            if self._reservations:
+                await asyncio.sleep(TimeConstants.BALANCE_RECONCILE_RETRY)
+                continue
+            
+            self._stale.clear()
+            if not await self.reconcile():
+                self._stale.set()
+                await asyncio.sleep(TimeConstants.BALANCE_RECONCILE_RETRY)
+    
+
+    async def reconcile(self) -> bool:
+        version = self._version
+        
+        try:
+            server_balance = await self.fetch_balance()
+        except Exception as e:
+            logger.warning(f"[{self.owner}] Не удалось сверить баланс: {e}")
+            return False
+        
+        if version != self._version or self._reservations:
+            return False
+        
+        drift = server_balance - self._balance
+        if drift:
+            self.drift_total += abs(drift)
+            logger.info(f"[{self.owner}] Баланс сверен: {self._balance} → {server_balance} Stars")
+        
+        self._balance = server_balance
+        self.reconcile_count += 1
+        return True
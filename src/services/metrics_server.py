@@ -0,0 +1,51 @@
+import asyncio
+from typing import Optional
+
+from src.core.constants import TimeConstants
+from src.utils import logger, metrics
+
+
+class MetricsServer:
+    
+    def __init__(self, port: int, host: str = "127.0.0.1"):
+        self.port = port
+        self.host = host
+        self._server: Optional[asyncio.AbstractServer] = None
+    
+
+    async def start(self) -> None:
+        try:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            logger.info(f"Метрики доступны на http://{self.host}:{self.port}/metrics")
+        except OSError as e:
+            logger.error(f"Не удалось запустить сервер метрик на порту {self.port}: {e}")
+    
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+    
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await asyncio.wait_for(reader.readline(), timeout=TimeConstants.METRICS_REQUEST_TIMEOUT)
+            parts = request.decode("latin-1").split()
+            
+            if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", metrics.render().encode()
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
@@ -1,47 +1,135 @@
 import asyncio
-import time
-import random
 import gc
-from typing import List, Optional
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
 
 from pyrogram import Client
 from pyrogram.errors import FloodWait
 
-from src.core.models import GiftCriteria
-from src.core.constants import TimeConstants
+from src.core.constants import FileConstants, TimeConstants
+from src.core.models import (
+    GiftCriteria, GiftAddedEvent, GiftFoundEvent, PurchaseSucceededEvent, PurchaseFailedEvent
+)
 from src.services.buyer import GiftBuyer
+from src.services.catalog import CatalogCache
+from src.services.discovery import DiscoveryRegistry
+from src.services.drop_windows import DropWindowPredictor, parse_schedule
+from src.services.events import EventBus
 from src.services.hunter import GiftHunter
+from src.services.metrics_server import MetricsServer
+from src.services.pipeline import GiftPipeline
+from src.services.poll_rate import PollRateController
 from src.services.purchase_manager import PurchaseManager
+from src.services.recorder import SessionRecorder
+from src.services.poll_gate import PollGate
+from src.services.scheduler import HunterScheduler
+from src.services.state_store import StateStore
 from src.services.stats_manager import StatsManager
+from src.services.supply_tracker import SupplyTracker
+from src.services.tracing import Tracer
+from src.services.watchdog import LoopWatchdog
 from src.telegram.notification_bot import NotificationBot
-from src.utils import logger
+from src.utils import logger, clock
 import config
 
 
 class GiftMonitor:
     
     def __init__(self, buyer_clients: List[Client], hunter_clients: List[Client], 
-                 criteria: List[GiftCriteria], notification_bot: Optional[NotificationBot] = None):
+                 criteria: List[GiftCriteria], notification_bot: Optional[NotificationBot] = None,
+                 state_store: Optional[StateStore] = None):
         
-        self.buyers = [GiftBuyer(client, config.TARGET_USERNAMES, idx) 
+        self.tracer = Tracer(
+            Path(FileConstants.LOGS_DIR) / FileConstants.TRACE_FILE if config.TRACE_EXPORT else None
+        )
+        self._poll_gates: Dict[int, PollGate] = {}
+        self.buyers = [GiftBuyer(client, config.TARGET_USERNAMES, idx, self.tracer, self._gate_for(client)) 
                       for idx, client in enumerate(buyer_clients)]
         
-        self.hunters = [GiftHunter(client, idx) for idx, client in enumerate(hunter_clients)]
+        self.state_store = state_store
+        self.registry = DiscoveryRegistry(state_store)
+        self.hunters = [
+            GiftHunter(
+                client, idx, self.registry, self._catalog_cache_for_hunter(), config.LEAN_CATALOG_DECODE,
+                self._gate_for(client)
+            )
+            for idx, client in enumerate(hunter_clients)
+        ]
+        
+        self.events = EventBus()
+        if notification_bot:
+            self._subscribe_notifications(notification_bot)
         
         self.purchase_manager = PurchaseManager(
             buyers=self.buyers,
             criteria=criteria,
-            notification_bot=notification_bot,
+            events=self.events,
             purchase_non_limited=config.PURCHASE_NON_LIMITED_GIFTS,
-            fallback_purchase=config.FALLBACK_PURCHASE
+            fallback_purchase=config.FALLBACK_PURCHASE,
+            state_store=state_store,
+            tracer=self.tracer,
+            supply=SupplyTracker() if config.STOP_DOOMED_PURCHASES else None
         )
-        self.stats_manager = StatsManager()
+        self.pipeline = GiftPipeline(self.registry, self.purchase_manager, tracer=self.tracer, events=self.events)
+        self.stats_manager = StatsManager(self.tracer)
+        self.metrics_server = MetricsServer(config.METRICS_PORT) if config.METRICS_PORT else None
+        self.recorder = SessionRecorder(
+            Path(FileConstants.LOGS_DIR) / FileConstants.RECORDING_FILE_PATTERN.format(
+                time=datetime.now().strftime("%Y%m%d_%H%M%S")
+            )
+        ) if config.RECORD_SESSION else None
+        self.watchdog = LoopWatchdog(
+            config.LOOP_STALL_THRESHOLD,
+            busy=lambda: self.purchase_manager.active_purchases > 0
+        ) if config.LOOP_STALL_THRESHOLD > 0 else None
+        self.scheduler = HunterScheduler(
+            check_interval=config.CHECK_INTERVAL,
+            jitter_max=config.RANDOM_DELAY_MAX,
+            idle_interval=config.IDLE_POLL_INTERVAL
+        )
+        self.drop_predictor = DropWindowPredictor(
+            parse_schedule(config.DROP_SCHEDULE), state_store
+        ) if config.DROP_PREDICTION else None
+        if self.drop_predictor:
+            self.events.subscribe(GiftAddedEvent, self._on_gift_added)
         
         self.notification_bot = notification_bot
         
         self._running = False
         self._buying_in_progress = False
-        self._hunter_tasks: List[asyncio.Task] = []
+        self._hunter_tasks: Dict[int, asyncio.Task] = {}
+    
+
+    def _subscribe_notifications(self, bot: NotificationBot) -> None:
+        async def on_gift_found(event: GiftFoundEvent) -> None:
+            await bot.send_gift_found(event.gift)
+        
+        async def on_purchase_succeeded(event: PurchaseSucceededEvent) -> None:
+            await bot.send_purchase_success(event.gift_id, event.quantity, event.total_spent)
+        
+        async def on_purchase_failed(event: PurchaseFailedEvent) -> None:
+            await bot.send_purchase_error(event.gift_id, event.error)
+        
+        self.events.subscribe(GiftFoundEvent, on_gift_found)
+        self.events.subscribe(PurchaseSucceededEvent, on_purchase_succeeded)
+        self.events.subscribe(PurchaseFailedEvent, on_purchase_failed)
+    
+
+    def _gate_for(self, client: Client) -> PollGate:
+        gate = self._poll_gates.get(id(client))
+        if gate is None:
+            gate = PollGate(Path(str(getattr(client, 'name', len(self._poll_gates)))).name)
+            self._poll_gates[id(client)] = gate
+        return gate
+    
+
+    def _catalog_cache_for_hunter(self) -> Optional[CatalogCache]:
+        if config.CATALOG_HASH_MODE == "hunter":
+            return CatalogCache()
+        if config.CATALOG_HASH_MODE == "shared":
+            return self.registry.catalog
+        return None
     
 
     async def initialize(self) -> bool:
@@ -75,52 +163,85 @@ class GiftMonitor:
     
 
     async def _hunter_loop(self, hunter: GiftHunter) -> None:
-        await asyncio.sleep(
-            random.uniform(0, TimeConstants.HUNTER_INITIAL_DELAY_MAX * len(self.hunters))
-        )
-        
-        consecutive_errors = 0
-        check_interval = config.CHECK_INTERVAL
+        self.scheduler.register(hunter.hunter_id, PollRateController(
+            hunter.account,
+            check_interval=config.CHECK_INTERVAL,
+            min_interval=config.POLL_INTERVAL_MIN,
+            adaptive=config.ADAPTIVE_POLLING,
+            store=self.state_store
+        ))
         
-        while self._running:
-            try:
-                start_time = time.time()
-                
-                new_gifts = await hunter.check_gifts()
-                
-                if new_gifts:
-                    asyncio.create_task(self.purchase_manager.process_gifts(new_gifts))
-                
-                self.stats_manager.increment_checks()
-                consecutive_errors = 0
-                
-                check_duration = time.time() - start_time
-                sleep_time = max(0.1, check_interval - check_duration)
+        try:
+            while self._running:
+                await self.scheduler.wait_turn(hunter.hunter_id)
                 
-                if config.RANDOM_DELAY_MAX > 0:
-                    sleep_time += random.uniform(0, config.RANDOM_DELAY_MAX)
+                snapshot = None
+                started = clock.monotonic()
+                try:
+                    snapshot = await hunter.fetch()
+                    if snapshot is None and self.purchase_manager.supply:
+                        self.purchase_manager.supply.confirm(hunter.sent_at)
                     
-            except FloodWait as e:
-                logger.warning(f"[Hunter-{hunter.hunter_id}] FloodWait: {e.value}с")
-                sleep_time = e.value
+                    self.pipeline.fetch.record(clock.monotonic() - started)
+                    self.stats_manager.increment_checks()
+                    self.scheduler.report_success(hunter.hunter_id)
                 
-            except Exception as e:
-                consecutive_errors += 1
-                logger.error(f"[Hunter-{hunter.hunter_id}] Ошибка: {e}")
+                except FloodWait as e:
+                    self.pipeline.fetch.record(clock.monotonic() - started, ok=False)
+                    self.scheduler.report_flood_wait(hunter.hunter_id, e.value)
                 
-                if consecutive_errors > 3:
-                    sleep_time = check_interval * 2
-                else:
-                    sleep_time = check_interval
-            
-            await asyncio.sleep(sleep_time)
+                except Exception:
+                    self.pipeline.fetch.record(clock.monotonic() - started, ok=False)
+                    self.scheduler.report_error(hunter.hunter_id)
+                
+                if snapshot:
+                    if self.recorder:
+                        self.recorder.record_catalog(snapshot.gifts)
+                    await self.pipeline.submit(snapshot)
+        finally:
+            self.scheduler.unregister(hunter.hunter_id)
+    
+
+    def add_hunter(self, client: Client) -> GiftHunter:
+        hunter_id = max((hunter.hunter_id for hunter in self.hunters), default=-1) + 1
+        hunter = GiftHunter(
+            client, hunter_id, self.registry, self._catalog_cache_for_hunter(), config.LEAN_CATALOG_DECODE,
+            self._gate_for(client)
+        )
+        self.hunters.append(hunter)
+        
+        if self._running:
+            self._hunter_tasks[hunter_id] = asyncio.create_task(self._hunter_loop(hunter))
+        
+        logger.info(f"[Hunter-{hunter_id}] Добавлен в ротацию")
+        return hunter
+    
+
+    async def _on_gift_added(self, event: GiftAddedEvent) -> None:
+        if self.drop_predictor.observe_added(event, clock.time()):
+            self._update_poll_mode()
+    
+
+    def _update_poll_mode(self) -> None:
+        self.scheduler.set_mode(self.drop_predictor.mode_at(clock.time()))
+    
+
+    async def _poll_mode_loop(self) -> None:
+        while self._running:
+            self._update_poll_mode()
+            await asyncio.sleep(TimeConstants.POLL_MODE_CHECK_INTERVAL)
     
 
     async def _memory_cleanup_loop(self) -> None:
         while self._running:
             await asyncio.sleep(60)
             
-            self.stats_manager.log_performance(self.purchase_manager.processed_count)
+            self.stats_manager.log_performance(
+                self.purchase_manager.processed_count,
+                self.scheduler.get_stats(),
+                self.pipeline.get_stats(),
+                self.watchdog.get_stats() if self.watchdog else None
+            )
             self.purchase_manager.cleanup_old_gifts()
             gc.collect()
     
@@ -133,11 +254,26 @@ class GiftMonitor:
         self._running = True
         logger.info("Запуск мониторинга подарков...")
         
+        self.scheduler.start()
+        self.pipeline.start()
+        self.events.start()
+        if self.watchdog:
+            self.watchdog.start()
+        if self.metrics_server:
+            await self.metrics_server.start()
+        if self.recorder:
+            self.recorder.start()
+        for buyer in self.buyers:
+            buyer.ledger.start()
+        if self.state_store:
+            self.state_store.start()
+        
         for hunter in self.hunters:
-            task = asyncio.create_task(self._hunter_loop(hunter))
-            self._hunter_tasks.append(task)
+            self._hunter_tasks[hunter.hunter_id] = asyncio.create_task(self._hunter_loop(hunter))
         
         asyncio.create_task(self._memory_cleanup_loop())
+        if self.drop_predictor:
+            asyncio.create_task(self._poll_mode_loop())
         
         if self.notification_bot:
             total_balance = sum(buyer.balance for buyer in self.buyers)
@@ -156,11 +292,25 @@ class GiftMonitor:
         logger.info("Остановка мониторинга...")
         self._running = False
         
-        for task in self._hunter_tasks:
+        for task in self._hunter_tasks.values():
             task.cancel()
         
-        await asyncio.gather(*self._hunter_tasks, return_exceptions=True)
+        await asyncio.gather(*self._hunter_tasks.values(), return_exceptions=True)
         self._hunter_tasks.clear()
+        await self.pipeline.stop()
+        await self.scheduler.stop()
+        for buyer in self.buyers:
+            await buyer.ledger.stop()
+        
+        await self.events.stop()
+        if self.watchdog:
+            await self.watchdog.stop()
+        if self.metrics_server:
+            await self.metrics_server.stop()
+        if self.recorder:
+            await self.recorder.stop()
+        if self.state_store:
+            await self.state_store.stop()
         
         logger.info("[DONE] Мониторинг остановлен")
     
@@ -170,7 +320,9 @@ class GiftMonitor:
             is_running=self._running,
             buyers=self.buyers,
             hunters=self.hunters,
-            processed_gifts=self.purchase_manager.processed_count
+            processed_gifts=self.purchase_manager.processed_count,
+            scheduler_stats=self.scheduler.get_stats(),
+            pipeline_stats=self.pipeline.get_stats(),
+            loop_stats=self.watchdog.get_stats() if self.watchdog else None
         )
         return monitor_stats.__dict__
-    
\ No newline at end of file
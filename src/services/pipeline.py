@@ -0,0 +1,184 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Iterable, List, Optional, Tuple
+
+from src.core.constants import Limits, TimeConstants
+from src.core.models import CatalogSnapshot, GiftData, PlannedPurchase, StageStats
+from src.services.catalog_diff import EVENT_KINDS
+from src.services.discovery import DiscoveryRegistry
+from src.services.events import EventBus
+from src.services.purchase_manager import PurchaseManager
+from src.services.tracing import Tracer
+from src.utils import logger, metrics, percentile, clock
+
+
+StageHandler = Callable[[Any], Awaitable[Optional[Iterable[Any]]]]
+
+
+class PipelineStage:
+    
+    def __init__(self, name: str, handler: Optional[StageHandler] = None,
+                 capacity: int = Limits.PIPELINE_QUEUE_SIZE, workers: int = 1,
+                 downstream: Optional["PipelineStage"] = None):
+        self.name = name
+        self.handler = handler
+        self.capacity = capacity
+        self.workers = workers
+        self.downstream = downstream
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=capacity)
+        self._tasks: List[asyncio.Task] = []
+        self._in_flight = 0
+        self._processed = 0
+        self._failed = 0
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=Limits.PIPELINE_LATENCY_SAMPLES)
+    
+
+    async def put(self, item: Any) -> None:
+        await self.queue.put(item)
+    
+
+    def record(self, latency: float, ok: bool = True) -> None:
+        self._processed += 1
+        if not ok:
+            self._failed += 1
+        self._samples.append((clock.monotonic(), latency))
+    
+
+    def start(self) -> None:
+        if self.handler and not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+    
+
+    async def drain(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Этап {self.name}: не дождались обработки {self.queue.qsize()} элементов")
+            return False
+    
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+
+    async def _worker(self) -> None:
+        while True:
+            item = await self.queue.get()
+            self._in_flight += 1
+            started = clock.monotonic()
+            
+            try:
+                try:
+                    outputs = await self.handler(item)
+                except Exception as e:
+                    outputs = None
+                    self.record(clock.monotonic() - started, ok=False)
+                    logger.error(f"Этап {self.name}: ошибка обработки: {e}")
+                else:
+                    self.record(clock.monotonic() - started)
+                
+                if outputs and self.downstream:
+                    for output in outputs:
+                        await self.downstream.put(output)
+            finally:
+                self._in_flight -= 1
+                self.queue.task_done()
+    
+
+    def get_stats(self) -> StageStats:
+        now = clock.monotonic()
+        latencies = [latency for _, latency in self._samples]
+        recent = sum(1 for finished, _ in self._samples if now - finished <= TimeConstants.PIPELINE_RATE_WINDOW)
+        
+        return StageStats(
+            name=self.name,
+            depth=self.queue.qsize(),
+            capacity=self.capacity,
+            in_flight=self._in_flight,
+            processed=self._processed,
+            failed=self._failed,
+            latency_p50=percentile(latencies, 50),
+            latency_p95=percentile(latencies, 95),
+            throughput=recent / TimeConstants.PIPELINE_RATE_WINDOW
+        )
+
+
+
+class GiftPipeline:
+    
+    def __init__(self, registry: DiscoveryRegistry, purchase_manager: PurchaseManager,
+                 capacity: int = Limits.PIPELINE_QUEUE_SIZE,
+                 purchase_workers: int = Limits.PIPELINE_PURCHASE_WORKERS,
+                 tracer: Optional[Tracer] = None, events: Optional[EventBus] = None):
+        self.registry = registry
+        self.purchase_manager = purchase_manager
+        self.tracer = tracer or Tracer()
+        self.events = events
+        
+        self.purchase = PipelineStage("purchase", self._purchase, capacity, purchase_workers)
+        self.allocation = PipelineStage("allocation", self._allocate, capacity, downstream=self.purchase)
+        self.evaluation = PipelineStage("evaluation", self._evaluate, capacity, downstream=self.allocation)
+        self.diff = PipelineStage("diff", self._diff, capacity, downstream=self.evaluation)
+        self.fetch = PipelineStage("fetch", capacity=0, downstream=self.diff)
+        self.stages = [self.fetch, self.diff, self.evaluation, self.allocation, self.purchase]
+    
+
+    async def submit(self, snapshot: CatalogSnapshot) -> None:
+        await self.diff.put(snapshot)
+    
+
+    async def _diff(self, snapshot: CatalogSnapshot) -> Optional[List[List[GiftData]]]:
+        started = clock.monotonic()
+        new_gifts, changes = self.registry.apply(snapshot)
+        finished = clock.monotonic()
+        
+        for change in changes:
+            metrics.inc("sniper_catalog_events_total", kind=EVENT_KINDS[type(change)])
+            if self.purchase_manager.supply:
+                self.purchase_manager.supply.observe(change)
+            if self.events:
+                self.events.emit(change)
+        if self.purchase_manager.supply:
+            self.purchase_manager.supply.confirm(snapshot.sent_at)
+        
+        for gift in new_gifts:
+            self.tracer.begin(gift.id, snapshot.fetch_started)
+            self.tracer.span(
+                gift.id, "fetch", snapshot.fetch_started, snapshot.fetch_finished, hunter=snapshot.hunter_id
+            )
+            self.tracer.span(gift.id, "diff", started, finished)
+        
+        return [new_gifts] if new_gifts else None
+    
+
+    async def _evaluate(self, gifts: List[GiftData]) -> Optional[list]:
+        candidates = self.purchase_manager.select(gifts)
+        return [candidates] if candidates else None
+    
+
+    async def _allocate(self, candidates: list) -> List[PlannedPurchase]:
+        return self.purchase_manager.plan(candidates)
+    
+
+    async def _purchase(self, planned: PlannedPurchase) -> None:
+        await self.purchase_manager.execute_plan(planned)
+    
+
+    def start(self) -> None:
+        for stage in self.stages:
+            stage.start()
+    
+
+    async def stop(self, timeout: float = TimeConstants.PIPELINE_DRAIN_TIMEOUT) -> None:
+        deadline = clock.monotonic() + timeout
+        for stage in self.stages:
+            await stage.drain(max(0.0, deadline - clock.monotonic()))
+            await stage.stop()
+    
+
+    def get_stats(self) -> List[StageStats]:
+        return [stage.get_stats() for stage in self.stages]
@@ -0,0 +1,103 @@
+import math
+from itertools import groupby
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from src.core.models import GiftData, PlannedPurchase, PurchaseDecision
+from src.services.buyer import GiftBuyer
+
+
+class PurchasePlanner:
+    
+    def plan(self, candidates: Sequence[Tuple[GiftData, PurchaseDecision]], buyers: Sequence[GiftBuyer],
+             already_bought: Callable[[GiftBuyer, GiftData], int]) -> List[PlannedPurchase]:
+        plans = [
+            PlannedPurchase(gift=gift, decision=decision)
+            for gift, decision in sorted(candidates, key=lambda c: (c[1].priority, self._supply(c[0]), c[0].id))
+        ]
+        weights = self._weights(plans)
+        tiers = self._tiers(plans)
+        
+        for buyer in buyers:
+            wanted = [
+                max(0, min(plan.decision.quantity - already_bought(buyer, plan.gift), self._remaining(plan.gift)))
+                for plan in plans
+            ]
+            budget = buyer.available
+            for tier in tiers:
+                for index, quantity in self._allocate(plans, weights, wanted, budget, tier).items():
+                    plans[index].allocations[buyer.buyer_id] = quantity
+                    budget -= quantity * plans[index].gift.price
+        
+        return plans
+    
+
+    @staticmethod
+    def _tiers(plans: List[PlannedPurchase]) -> List[List[int]]:
+        return [
+            [index for index, _ in group]
+            for _, group in groupby(enumerate(plans), key=lambda item: item[1].decision.priority)
+        ]
+    
+
+    def _allocate(self, plans: List[PlannedPurchase], weights: List[float],
+                  wanted: List[int], budget: int, tier: List[int]) -> Dict[int, int]:
+        taken: Dict[int, int] = {}
+        
+        while True:
+            room = {
+                index: wanted[index] - taken.get(index, 0)
+                for index in tier
+                if taken.get(index, 0) < wanted[index] and 0 < plans[index].gift.price <= budget
+            }
+            if not room:
+                return taken
+            
+            level = self._fill_level(plans, weights, room, budget)
+            granted = {
+                index: count if weights[index] * level >= count else int(weights[index] * level)
+                for index, count in room.items()
+            }
+            
+            if not any(granted.values()):
+                index = min(room, key=lambda i: ((taken.get(i, 0) + 1) / weights[i], i))
+                granted = {index: 1}
+            
+            for index, count in granted.items():
+                price = plans[index].gift.price
+                count = min(count, budget // price)
+                if count:
+                    taken[index] = taken.get(index, 0) + count
+                    budget -= count * price
+    
+
+    @staticmethod
+    def _fill_level(plans: List[PlannedPurchase], weights: List[float],
+                    room: Dict[int, int], budget: int) -> float:
+        slope = sum(plans[index].gift.price * weights[index] for index in room)
+        saturated_cost = 0
+        
+        for index in sorted(room, key=lambda i: room[i] / weights[i]):
+            level = room[index] / weights[index]
+            if saturated_cost + slope * level >= budget:
+                return (budget - saturated_cost) / slope
+            
+            price = plans[index].gift.price
+            saturated_cost += price * room[index]
+            slope -= price * weights[index]
+        
+        return math.inf
+    
+
+    def _weights(self, plans: List[PlannedPurchase]) -> List[float]:
+        reference = max((self._supply(plan.gift) for plan in plans), default=1)
+        return [math.sqrt(reference / self._supply(plan.gift)) for plan in plans]
+    
+
+    @staticmethod
+    def _remaining(gift: GiftData) -> int:
+        return gift.available_amount if gift.is_limited and gift.available_amount is not None else 10 ** 9
+    
+
+    @staticmethod
+    def _supply(gift: GiftData) -> int:
+        return gift.total_amount if gift.is_limited and gift.total_amount > 0 else 10 ** 9
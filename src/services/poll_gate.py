@@ -0,0 +1,50 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from src.core.constants import TimeConstants
+from src.utils import metrics, clock
+
+
+class PollGate:
+    
+    def __init__(self, account: str, pause_max: float = TimeConstants.POLL_PAUSE_MAX):
+        self.account = account
+        self.pause_max = pause_max
+        self._purchases = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+    
+
+    @asynccontextmanager
+    async def purchasing(self) -> AsyncIterator[None]:
+        self._purchases += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._purchases -= 1
+            if self._purchases == 0:
+                self._idle.set()
+    
+
+    @asynccontextmanager
+    async def call(self, method: str) -> AsyncIterator[None]:
+        async with metrics.rpc(method, self.account):
+            yield
+    
+
+    @asynccontextmanager
+    async def poll(self, method: str) -> AsyncIterator[None]:
+        # Уже отправленный RPC не вытеснить, поэтому покупки получают приоритет иначе:
+        # пока на аккаунте идет покупка, опрос каталога ждет до pause_max секунд
+        if self._purchases:
+            paused_at = clock.monotonic()
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout=self.pause_max)
+            except asyncio.TimeoutError:
+                pass
+            metrics.observe("sniper_poll_pause_seconds", clock.monotonic() - paused_at, account=self.account)
+        
+        async with metrics.rpc(method, self.account):
+            yield
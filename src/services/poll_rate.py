@@ -0,0 +1,69 @@
+from typing import Optional
+
+from src.core.constants import TimeConstants
+from src.services.state_store import StateStore
+from src.utils import logger
+
+
+class PollRateController:
+    
+    def __init__(self, account: str, check_interval: float, min_interval: float,
+                 adaptive: bool = True, store: Optional[StateStore] = None):
+        self.account = account
+        self.adaptive = adaptive
+        self.store = store
+        self.max_rate = 1 / min(min_interval, check_interval)
+        self.min_rate = 1 / max(TimeConstants.POLL_INTERVAL_MAX, check_interval)
+        
+        learned = store.poll_rates.get(account) if store and adaptive else None
+        self.rate: float = self._clamp(learned if learned else 1 / check_interval)
+        self._persisted = self.rate
+        
+        if learned:
+            logger.info(f"[{account}] Восстановлен интервал опроса {self.interval:.2f} сек")
+    
+
+    @property
+    def interval(self) -> float:
+        return 1 / self.rate
+    
+
+    @property
+    def min_interval(self) -> float:
+        return 1 / self.max_rate
+    
+
+    def _clamp(self, rate: float) -> float:
+        return min(self.max_rate, max(self.min_rate, rate))
+    
+
+    def on_success(self) -> None:
+        if not self.adaptive or self.rate >= self.max_rate:
+            return
+        
+        self.rate = self._clamp(self.rate + TimeConstants.POLL_RATE_INCREASE / self.rate)
+        if self.rate >= self._persisted * (1 + TimeConstants.POLL_RATE_PERSIST_STEP):
+            self._persist()
+    
+
+    def on_flood_wait(self, seconds: float) -> None:
+        self._decrease()
+        logger.info(f"[{self.account}] FloodWait {seconds} сек, интервал опроса увеличен до {self.interval:.2f} сек")
+    
+
+    def on_error(self) -> None:
+        self._decrease()
+    
+
+    def _decrease(self) -> None:
+        if not self.adaptive:
+            return
+        
+        self.rate = self._clamp(self.rate * TimeConstants.POLL_RATE_DECREASE)
+        self._persist()
+    
+
+    def _persist(self) -> None:
+        self._persisted = self.rate
+        if self.store:
+            self.store.record_poll_rate(self.account, self.rate)
@@ -1,25 +1,42 @@
 import asyncio
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from src.core.models import GiftData, GiftCriteria, PurchaseDecision
+from src.core.models import (
+    GiftData, GiftCriteria, PlannedPurchase, PurchaseDecision, PurchaseResult,
+    GiftFoundEvent, PurchaseSucceededEvent, PurchaseFailedEvent
+)
 from src.core.constants import Limits
 from src.services.buyer import GiftBuyer
-from src.telegram.notification_bot import NotificationBot
-from src.utils import logger
+from src.services.cancellation import CancelToken
+from src.services.events import EventBus
+from src.services.ledger import Reservation
+from src.services.planner import PurchasePlanner
+from src.services.tracing import Tracer
+from src.services.state_store import StateStore
+from src.services.supply_tracker import SupplyTracker
+from src.utils import logger, metrics, clock
 
 
 class PurchaseManager:
     
     def __init__(self, buyers: List[GiftBuyer], criteria: List[GiftCriteria], 
-                 notification_bot: Optional[NotificationBot] = None,
+                 events: Optional[EventBus] = None,
                  purchase_non_limited: bool = False,
-                 fallback_purchase: bool = False):
+                 fallback_purchase: bool = False,
+                 state_store: Optional[StateStore] = None,
+                 tracer: Optional[Tracer] = None,
+                 supply: Optional[SupplyTracker] = None):
         self.buyers = buyers
         self.criteria = criteria
-        self.notification_bot = notification_bot
+        self.events = events or EventBus()
         self.purchase_non_limited = purchase_non_limited
         self.fallback_purchase = fallback_purchase
-        self._processed_gifts: set[int] = set()
+        self.state_store = state_store
+        self.planner = PurchasePlanner()
+        self.tracer = tracer or Tracer()
+        self.supply = supply
+        self._processed_gifts: set[int] = set(state_store.processed_gifts) if state_store else set()
+        self.active_purchases: int = 0
     
 
     def evaluate_gift(self, gift_data: GiftData) -> PurchaseDecision:
@@ -32,13 +49,14 @@ class PurchaseManager:
         price = gift_data.price
         supply = gift_data.total_amount
         
-        for criteria in self.criteria:
+        for priority, criteria in enumerate(self.criteria):
             if criteria.matches(supply, price):
                 return PurchaseDecision(
                     should_buy=True,
                     quantity=criteria.quantity,
                     matched_criteria=criteria,
-                    reason=f"Совпадение: supply={supply}, price={price}"
+                    reason=f"Совпадение: supply={supply}, price={price}",
+                    priority=priority
                 )
         
         return PurchaseDecision(
@@ -48,106 +66,148 @@ class PurchaseManager:
     
 
     async def process_gifts(self, gifts: List[GiftData]) -> None:
+        candidates = self.select(gifts)
+        if not candidates:
+            return
+        
+        await asyncio.gather(*(self.execute_plan(planned) for planned in self.plan(candidates)))
+    
+
+    def select(self, gifts: List[GiftData]) -> List[Tuple[GiftData, PurchaseDecision]]:
         new_gifts = [g for g in gifts if g.id not in self._processed_gifts]
         if not new_gifts:
-            return
-            
+            return []
         
+
         for gift in new_gifts:
             self._processed_gifts.add(gift.id)
-            if self.notification_bot:
-                await self.notification_bot.send_gift_found(gift)
-        
-        new_gifts.sort(key=lambda g: g.total_amount)
+            if self.state_store:
+                self.state_store.record_processed(gift.id)
+            self.events.emit(GiftFoundEvent(gift))
         
+        candidates = []
         for gift in new_gifts:
+            started = clock.monotonic()
             decision = self.evaluate_gift(gift)
+            self.tracer.span(gift.id, "evaluate", started, should_buy=decision.should_buy)
             if decision.should_buy:
-                await self._buy_gift_with_all_buyers(gift, decision)
-        
-        if self.fallback_purchase:
-            for gift in new_gifts:
-                if gift.is_sold_out:
-                    continue
-                    
-                decision = self.evaluate_gift(gift)
-                if decision.should_buy:
-                    continue
-                
-                total_balance = sum(buyer.balance for buyer in self.buyers)
-                max_affordable_total = total_balance // gift.price if gift.price > 0 else 0
-                
-                if max_affordable_total > 0:
-                    target_quantity = self.criteria[0].quantity if self.criteria else 9999
-                    
-                    fallback_decision = PurchaseDecision(
-                        should_buy=True,
-                        quantity=target_quantity,
-                        reason=f"Fallback покупка: максимум {target_quantity} шт."
-                    )
-                    
-                    success = await self._buy_gift_with_all_buyers(gift, fallback_decision)
-                    if success:
-                        logger.info(f"Fallback покупка успешна для подарка {gift.id}")
+                candidates.append((gift, decision))
+            elif self.fallback_purchase and not gift.is_sold_out:
+                target_quantity = self.criteria[0].quantity if self.criteria else 9999
+                candidates.append((gift, PurchaseDecision(
+                    should_buy=True,
+                    quantity=target_quantity,
+                    reason=f"Fallback покупка: максимум {target_quantity} шт.",
+                    priority=len(self.criteria)
+                )))
+        
+        return candidates
+    
+
+    def plan(self, candidates: List[Tuple[GiftData, PurchaseDecision]]) -> List[PlannedPurchase]:
+        started = clock.monotonic()
+        plan = self.planner.plan(candidates, self.buyers, self._already_bought)
+        finished = clock.monotonic()
+        for planned in plan:
+            self.tracer.span(planned.gift.id, "allocate", started, finished, quantity=planned.quantity)
+        if len(plan) > 1:
+            logger.info(
+                "План покупки: " + ", ".join(f"{p.gift.id}×{p.quantity}" for p in plan)
+            )
+        return plan
+    
+
+    async def execute_plan(self, planned: PlannedPurchase) -> bool:
+        self.active_purchases += 1
+        try:
+            return await self._execute_plan(planned)
+        finally:
+            self.active_purchases -= 1
     
 
-    async def _buy_gift_with_all_buyers(self, gift: GiftData, decision: PurchaseDecision) -> bool:        
+    async def _execute_plan(self, planned: PlannedPurchase) -> bool:
+        gift = planned.gift
+        buyers = {buyer.buyer_id: buyer for buyer in self.buyers}
+        started = clock.monotonic()
+        
         logger.info(
-            f"Покупаем подарок {gift.id}: до {decision.quantity} шт. "
-            f"по {gift.price} Stars с {len(self.buyers)} аккаунтов"
+            f"Покупаем подарок {gift.id}: {planned.quantity} шт. "
+            f"по {gift.price} Stars с {len(planned.allocations)} аккаунтов ({planned.decision.reason})"
         )
         
+        cancel = CancelToken(f"Gift-{gift.id}")
         tasks = []
-        for buyer in self.buyers:
-            max_affordable = buyer.balance // gift.price if gift.price > 0 else 0
-            if max_affordable > 0:
-                quantity_to_buy = min(decision.quantity, max_affordable)
-                task = self._buy_with_buyer(buyer, gift, quantity_to_buy)
+        active_buyers = []
+        for buyer_id, quantity in planned.allocations.items():
+            buyer = buyers[buyer_id]
+            reservation = buyer.ledger.reserve(gift.price, quantity)
+            if reservation.quantity > 0:
+                task = self._buy_with_buyer(buyer, gift, reservation, cancel)
                 tasks.append(task)
+                active_buyers.append(buyer)
+        
+        self.tracer.span(gift.id, "dispatch", started, buyers=len(tasks))
         
         if not tasks:
             logger.error(f"Ни один покупатель не может позволить подарок {gift.id}")
+            self.tracer.finish(gift.id)
             return False
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         total_bought = 0
         total_spent = 0
+        wasted_rpc = 0
         errors = []
         
-        for result in results:
+        for buyer, result in zip(active_buyers, results):
             if isinstance(result, Exception):
                 errors.append(str(result))
-            elif result[0]:
-                try:
-                    bought_count = int(result[1].split('/')[0].split()[1])
-                except:
-                    bought_count = 0
-                total_bought += bought_count
-                total_spent += bought_count * gift.price
+                continue
+            
+            wasted_rpc += result.wasted_rpc
+            if result.success:
+                total_bought += result.bought
+                total_spent += result.bought * gift.price
+                if self.state_store:
+                    self.state_store.record_purchase(buyer.session_name, gift.id, result.bought)
+            elif result.message:
+                errors.append(result.message)
+        
+        self.tracer.span(gift.id, "purchase", started, bought=total_bought)
+        self.tracer.finish(gift.id)
+        metrics.inc("sniper_purchase_wasted_rpc_total", wasted_rpc, gift=gift.id)
+        if wasted_rpc:
+            logger.info(f"Подарок {gift.id}: лишних RPC {wasted_rpc}")
         
         if total_bought > 0:
             logger.success(f"[DONE] Всего куплено {total_bought} шт. подарка {gift.id}")
-            if self.notification_bot:
-                await self.notification_bot.send_purchase_success(
-                    gift.id, total_bought, total_spent
-                )
+            self.events.emit(PurchaseSucceededEvent(gift.id, total_bought, total_spent))
             return True
         else:
             error_msg = "; ".join(set(errors)) if errors else "Неизвестная ошибка"
             logger.error(f"Не удалось купить подарок {gift.id}: {error_msg}")
-            if self.notification_bot:
-                await self.notification_bot.send_purchase_error(gift.id, error_msg)
+            self.events.emit(PurchaseFailedEvent(gift.id, error_msg))
             return False
     
 
-    async def _buy_with_buyer(self, buyer: GiftBuyer, gift: GiftData, quantity: int) -> tuple:
+    def _already_bought(self, buyer: GiftBuyer, gift: GiftData) -> int:
+        if not self.state_store:
+            return 0
+        return self.state_store.purchased(buyer.session_name, gift.id)
+    
+
+    async def _buy_with_buyer(self, buyer: GiftBuyer, gift: GiftData, reservation: Reservation,
+                              cancel: CancelToken) -> PurchaseResult:
+        started = clock.monotonic()
         try:
-            success, message = await buyer.buy_gift(gift.id, quantity)
-            return (success, message)
+            result = await buyer.buy_gift(gift.id, reservation.quantity, reservation, cancel, self.supply)
+            self.tracer.span(gift.id, "buyer", started, buyer=buyer.buyer_id, bought=result.bought)
+            return result
         except Exception as e:
             logger.error(f"[Buyer-{buyer.buyer_id}] Ошибка покупки: {e}")
-            return (False, str(e))
+            reservation.release()
+            return PurchaseResult(gift_id=gift.id, requested=reservation.quantity, last_error=str(e))
     
 
     def cleanup_old_gifts(self, keep_last: int = Limits.MAX_PROCESSED_GIFTS) -> None:
@@ -160,4 +220,3 @@ class PurchaseManager:
     @property
     def processed_count(self) -> int:
         return len(self._processed_gifts)
-    
\ No newline at end of file
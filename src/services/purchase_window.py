@@ -0,0 +1,74 @@
+import asyncio
+from collections import deque
+from typing import Deque
+
+from src.utils import logger, clock
+
+
+class PurchaseWindow:
+    
+    def __init__(self, initial: int, maximum: int, owner: str = ""):
+        self.maximum = max(1, maximum)
+        self.limit: float = float(min(max(1, initial), self.maximum))
+        self.owner = owner
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._waiters: Deque[asyncio.Future] = deque()
+    
+
+    @property
+    def size(self) -> int:
+        return max(1, int(self.limit))
+    
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+    
+
+    async def acquire(self) -> None:
+        while True:
+            pause = self._paused_until - clock.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            
+            if self._in_flight < self.size:
+                self._in_flight += 1
+                return
+            
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+    
+
+    def release(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+    
+
+    def _wake(self) -> None:
+        free = self.size - self._in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+    
+
+    def on_success(self) -> None:
+        if self.limit < self.maximum:
+            previous = self.size
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if self.size > previous:
+                self._wake()
+    
+
+    def on_flood_wait(self, seconds: float) -> None:
+        self.limit = max(1.0, self.limit / 2)
+        self._paused_until = max(self._paused_until, clock.monotonic() + seconds)
+        logger.warning(f"[{self.owner}] Окно покупок уменьшено до {self.size}, пауза {seconds} сек")
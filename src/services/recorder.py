@@ -0,0 +1,106 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import List, Optional
+
+import aiofiles
+
+from src.core.constants import Limits, TimeConstants
+from src.core.models import GiftData
+from src.utils import logger, metrics, clock
+
+
+class SessionRecorder:
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self.records: int = 0
+        self._origin: float = 0.0
+        self._last_catalog: Optional[list] = None
+        self._pending: List[str] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+    
+
+    def _offset(self) -> float:
+        return round(clock.monotonic() - self._origin, 6)
+    
+
+    def _append(self, record: list) -> None:
+        self._pending.append(json.dumps(record, separators=(',', ':')))
+        self.records += 1
+        
+        if len(self._pending) >= Limits.RECORDING_FLUSH_BATCH:
+            self._wakeup.set()
+    
+
+    def record_catalog(self, gifts: List[GiftData]) -> None:
+        fields = sorted(
+            ([gift.id, gift.price, gift.is_limited, gift.is_sold_out,
+              gift.total_amount, gift.available_amount, gift.can_upgrade] for gift in gifts),
+            key=lambda item: item[0]
+        )
+        if fields == self._last_catalog:
+            return
+        
+        self._last_catalog = fields
+        self._append(["c", self._offset(), fields])
+    
+
+    def record_rpc(self, method: str, account: str, latency: float, error: Optional[str]) -> None:
+        self._append(["r", self._offset(), method, account, round(latency, 6), error])
+    
+
+    def start(self) -> None:
+        if self._flush_task is not None:
+            return
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._origin = clock.monotonic()
+        self._append(["start", clock.time()])
+        metrics.add_rpc_listener(self.record_rpc)
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info(f"Запись сессии в {self.path}")
+    
+
+    async def stop(self) -> None:
+        metrics.remove_rpc_listener(self.record_rpc)
+        
+        if self._flush_task:
+            self._stopping = True
+            self._wakeup.set()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        
+        logger.info(f"Запись сессии завершена: {self.records} записей")
+    
+
+    async def _flush_loop(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=TimeConstants.RECORDING_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            
+            self._wakeup.clear()
+            await self._safe_flush()
+        
+        await self._safe_flush()
+    
+
+    async def _safe_flush(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Ошибка записи сессии: {e}")
+    
+
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        
+        lines, self._pending = self._pending, []
+        
+        async with aiofiles.open(self.path, 'a', encoding='utf-8') as f:
+            await f.write('\n'.join(lines) + '\n')
@@ -0,0 +1,260 @@
+import asyncio
+import random
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from src.core.constants import TimeConstants, Limits
+from src.core.models import SchedulerStats
+from src.services.drop_windows import PollMode
+from src.services.poll_rate import PollRateController
+from src.utils import logger, metrics, percentile, clock
+
+
+class HunterScheduler:
+
+    def __init__(self, check_interval: float, jitter_max: float = 0.0, idle_interval: float = 0.0):
+        self.check_interval = check_interval
+        self.jitter_max = jitter_max
+        self.idle_interval = idle_interval
+        self.mode = PollMode.NORMAL
+        self._slots: List[int] = []
+        self._controllers: Dict[int, PollRateController] = {}
+        self._waiting: Dict[int, asyncio.Future] = {}
+        self._last_start: Dict[int, float] = {}
+        self._suspended_until: Dict[int, float] = {}
+        self._errors: Dict[int, int] = {}
+        self._cursor = 0
+        self._active_count = 0
+        self._last_dispatch: Optional[float] = None
+        self._next_jitter = 0.0
+        self._gaps: Deque[float] = deque(maxlen=Limits.SCHEDULER_GAP_SAMPLES)
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._dispatch_loop())
+
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        for future in self._waiting.values():
+            future.cancel()
+        self._waiting.clear()
+
+
+    def register(self, hunter_id: int, controller: Optional[PollRateController] = None) -> None:
+        if controller is not None:
+            self._controllers[hunter_id] = controller
+        if hunter_id not in self._slots:
+            self._slots.append(hunter_id)
+            self._changed.set()
+
+
+    def unregister(self, hunter_id: int) -> None:
+        if hunter_id in self._slots:
+            self._slots.remove(hunter_id)
+
+        future = self._waiting.pop(hunter_id, None)
+        if future and not future.done():
+            future.cancel()
+
+        self._last_start.pop(hunter_id, None)
+        self._suspended_until.pop(hunter_id, None)
+        self._errors.pop(hunter_id, None)
+        self._controllers.pop(hunter_id, None)
+        self._changed.set()
+
+
+    def suspend(self, hunter_id: int, seconds: float) -> None:
+        resume_at = clock.monotonic() + seconds
+        self._suspended_until[hunter_id] = max(resume_at, self._suspended_until.get(hunter_id, 0.0))
+        logger.info(f"[Scheduler] Охотник {hunter_id} исключен из ротации на {seconds:.1f} сек")
+        self._changed.set()
+
+
+    def set_mode(self, mode: PollMode) -> None:
+        if mode is self.mode:
+            return
+
+        self.mode = mode
+        for known in PollMode:
+            metrics.set("sniper_poll_mode", 1 if known is mode else 0, mode=known.value)
+        logger.info(f"[Scheduler] Режим опроса: {mode.value}")
+        self._changed.set()
+
+
+    def report_success(self, hunter_id: int) -> None:
+        self._errors[hunter_id] = 0
+        controller = self._controllers.get(hunter_id)
+        if controller and self.mode is not PollMode.IDLE:
+            controller.on_success()
+
+
+    def report_flood_wait(self, hunter_id: int, seconds: float) -> None:
+        controller = self._controllers.get(hunter_id)
+        if controller:
+            controller.on_flood_wait(seconds)
+        self.suspend(hunter_id, seconds)
+
+
+    def report_error(self, hunter_id: int) -> None:
+        controller = self._controllers.get(hunter_id)
+        if controller:
+            controller.on_error()
+        self._errors[hunter_id] = self._errors.get(hunter_id, 0) + 1
+        if self._errors[hunter_id] > Limits.HUNTER_MAX_CONSECUTIVE_ERRORS:
+            self.suspend(hunter_id, self.check_interval)
+
+
+    async def wait_turn(self, hunter_id: int) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[hunter_id] = future
+        self._changed.set()
+
+        try:
+            await future
+        finally:
+            if self._waiting.get(hunter_id) is future:
+                del self._waiting[hunter_id]
+
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            now = clock.monotonic()
+            active = self._active_slots(now)
+
+            if not active:
+                await self._wait_changed(self._next_resume(now))
+                continue
+
+            gap = self._fleet_gap(active)
+
+            if self._last_dispatch is not None:
+                due = self._last_dispatch + gap + self._next_jitter
+                if now < due:
+                    await self._wait_changed(due - now)
+                    continue
+
+            hunter_id = self._pick(active, now)
+            if hunter_id is None:
+                await self._wait_changed(self._next_eligible(active, now))
+                continue
+
+            self._fire(hunter_id, now, gap)
+
+
+    def _active_slots(self, now: float) -> List[int]:
+        for hunter_id, resume_at in list(self._suspended_until.items()):
+            if resume_at <= now:
+                del self._suspended_until[hunter_id]
+                logger.info(f"[Scheduler] Охотник {hunter_id} возвращен в ротацию")
+
+        active = [h for h in self._slots if h not in self._suspended_until]
+
+        if len(active) != self._active_count:
+            self._active_count = len(active)
+            if active:
+                logger.debug(
+                    f"[Scheduler] Перераспределение слотов: {len(active)} охотников, "
+                    f"интервал флота {self._fleet_gap(active):.2f} сек"
+                )
+
+        return active
+
+
+    def _interval(self, hunter_id: int) -> float:
+        controller = self._controllers.get(hunter_id)
+        interval = controller.interval if controller else self.check_interval
+
+        if self.mode is PollMode.BURST:
+            floor = controller.min_interval if controller else 0.0
+            return max(floor, interval * TimeConstants.BURST_INTERVAL_RATIO)
+        if self.mode is PollMode.IDLE:
+            return max(interval, self.idle_interval)
+        return interval
+
+
+    def _fleet_gap(self, active: List[int]) -> float:
+        return 1 / sum(1 / self._interval(h) for h in active) if active else 0.0
+
+
+    def _min_spacing(self, hunter_id: int) -> float:
+        return self._interval(hunter_id) * TimeConstants.HUNTER_MIN_SPACING_RATIO
+
+
+    def _pick(self, active: List[int], now: float) -> Optional[int]:
+        for offset in range(len(self._slots)):
+            index = (self._cursor + offset) % len(self._slots)
+            hunter_id = self._slots[index]
+
+            if hunter_id not in active or hunter_id not in self._waiting:
+                continue
+
+            last_start = self._last_start.get(hunter_id)
+            if last_start is not None and now - last_start < self._min_spacing(hunter_id):
+                continue
+
+            self._cursor = index + 1
+            return hunter_id
+
+        return None
+
+
+    def _next_eligible(self, active: List[int], now: float) -> Optional[float]:
+        waits = [
+            self._last_start.get(h, now) + self._min_spacing(h) - now
+            for h in active if h in self._waiting
+        ]
+        return max(0.0, min(waits)) if waits else None
+
+
+    def _next_resume(self, now: float) -> Optional[float]:
+        if not self._suspended_until:
+            return None
+        return max(0.0, min(self._suspended_until.values()) - now)
+
+
+    def _fire(self, hunter_id: int, now: float, gap: float) -> None:
+        future = self._waiting.pop(hunter_id)
+        if not future.done():
+            future.set_result(None)
+
+        if self._last_dispatch is not None:
+            self._gaps.append(now - self._last_dispatch)
+
+        self._last_dispatch = now
+        self._last_start[hunter_id] = now
+
+        jitter = min(self.jitter_max, gap * TimeConstants.SLOT_JITTER_RATIO)
+        self._next_jitter = random.uniform(-jitter, jitter) if jitter > 0 else 0.0
+
+
+    async def _wait_changed(self, timeout: Optional[float]) -> None:
+        self._changed.clear()
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+    def get_stats(self) -> SchedulerStats:
+        now = clock.monotonic()
+        active = [h for h in self._slots if self._suspended_until.get(h, 0.0) <= now]
+        gaps = list(self._gaps)
+
+        return SchedulerStats(
+            active_hunters=len(active),
+            suspended_hunters=len(self._slots) - len(active),
+            target_gap=self._fleet_gap(active),
+            gap_samples=len(gaps),
+            gap_p50=percentile(gaps, 50),
+            gap_p95=percentile(gaps, 95),
+            gap_max=max(gaps) if gaps else 0.0,
+            mode=self.mode.value
+        )
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import aiofiles
+
+from src.core.constants import TimeConstants, Limits
+from src.core.models import GiftData
+from src.utils import logger
+
+
+class StateStore:
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.known_gifts: Set[int] = set()
+        self.processed_gifts: Set[int] = set()
+        self.catalog_hash: int = 0
+        self.catalog: Dict[int, GiftData] = {}
+        self.purchases: Dict[str, Dict[int, int]] = {}
+        self.poll_rates: Dict[str, float] = {}
+        self.drops: List[float] = []
+        self._pending: List[str] = []
+        self._catalog_pending: Dict[int, Optional[GiftData]] = {}
+        self._hash_pending: bool = False
+        self._records: int = 0
+        self._flush_task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+
+        started = time.perf_counter()
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    self._apply(json.loads(line))
+                    self._records += 1
+                except (ValueError, IndexError, TypeError):
+                    logger.warning(f"Пропущена поврежденная запись состояния: {line[:50]!r}")
+
+        logger.info(
+            f"Состояние загружено за {(time.perf_counter() - started) * 1000:.1f} мс: "
+            f"известных подарков {len(self.known_gifts)}, обработанных {len(self.processed_gifts)}"
+        )
+
+
+    def _apply(self, record: list) -> None:
+        kind = record[0]
+
+        if kind == "k":
+            self.known_gifts.add(record[1])
+        elif kind == "f":
+            self.known_gifts.discard(record[1])
+        elif kind == "p":
+            self.processed_gifts.add(record[1])
+        elif kind == "h":
+            self.catalog_hash = record[1]
+        elif kind == "s":
+            self.catalog = {fields[0]: GiftData(*fields) for fields in record[1]}
+        elif kind == "g":
+            self.catalog[record[1][0]] = GiftData(*record[1])
+        elif kind == "x":
+            self.catalog.pop(record[1], None)
+        elif kind == "b":
+            buyer_purchases = self.purchases.setdefault(record[1], {})
+            buyer_purchases[record[2]] = buyer_purchases.get(record[2], 0) + record[3]
+        elif kind == "r":
+            self.poll_rates[record[1]] = record[2]
+        elif kind == "d":
+            self.drops.append(record[1])
+            horizon = record[1] - Limits.DROP_HISTORY_DAYS * 86400
+            if self.drops[0] < horizon:
+                self.drops = [timestamp for timestamp in self.drops if timestamp >= horizon]
+
+
+    def _append(self, record: list) -> None:
+        self._apply(record)
+        self._pending.append(json.dumps(record, separators=(',', ':')))
+
+        if len(self._pending) >= Limits.STATE_FLUSH_BATCH:
+            self._wakeup.set()
+
+
+    def record_known(self, gift_id: int) -> None:
+        self._append(["k", gift_id])
+
+
+    def forget_known(self, gift_id: int) -> None:
+        self._append(["f", gift_id])
+
+
+    def record_processed(self, gift_id: int) -> None:
+        if gift_id not in self.processed_gifts:
+            self._append(["p", gift_id])
+
+
+    def record_catalog(self, catalog_hash: int, changes: Dict[int, Optional[GiftData]]) -> None:
+        if catalog_hash != self.catalog_hash:
+            self.catalog_hash = catalog_hash
+            self._hash_pending = True
+
+        for gift_id, gift in changes.items():
+            if gift is None:
+                self.catalog.pop(gift_id, None)
+            else:
+                self.catalog[gift_id] = gift
+            self._catalog_pending[gift_id] = gift
+
+
+    def record_purchase(self, buyer_key: str, gift_id: int, count: int) -> None:
+        if count > 0:
+            self._append(["b", buyer_key, gift_id, count])
+
+
+    def record_poll_rate(self, account: str, rate: float) -> None:
+        self._append(["r", account, round(rate, 6)])
+
+
+    def record_drop(self, timestamp: float) -> None:
+        self._append(["d", round(timestamp, 3)])
+
+
+    @property
+    def catalog_snapshot(self) -> List[GiftData]:
+        return list(self.catalog.values())
+
+
+    def purchased(self, buyer_key: str, gift_id: int) -> int:
+        return self.purchases.get(buyer_key, {}).get(gift_id, 0)
+
+
+    @staticmethod
+    def _gift_fields(gift: GiftData) -> list:
+        return [
+            gift.id, gift.price, gift.is_limited, gift.is_sold_out,
+            gift.total_amount, gift.available_amount, gift.can_upgrade
+        ]
+
+
+    def start(self) -> None:
+        if self._flush_task is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+
+    async def stop(self) -> None:
+        if self._flush_task:
+            self._stopping = True
+            self._wakeup.set()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        else:
+            await self.flush()
+
+
+    async def _flush_loop(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=TimeConstants.STATE_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+            self._wakeup.clear()
+            await self._safe_flush()
+
+        await self._safe_flush()
+
+
+    async def _safe_flush(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"Ошибка сохранения состояния: {e}")
+
+
+    async def flush(self) -> None:
+        if not self._pending and not self._catalog_pending and not self._hash_pending:
+            return
+
+        if self._records > Limits.STATE_COMPACT_THRESHOLD and self._records > 4 * self._live_records():
+            await self._compact()
+            return
+
+        lines, self._pending = self._pending, []
+        lines += self._catalog_lines()
+
+        async with aiofiles.open(self.path, 'a', encoding='utf-8') as f:
+            await f.write('\n'.join(lines) + '\n')
+
+        self._records += len(lines)
+
+
+    def _catalog_lines(self) -> List[str]:
+        records = [["h", self.catalog_hash]] if self._hash_pending else []
+        records += [
+            ["g", self._gift_fields(gift)] if gift else ["x", gift_id]
+            for gift_id, gift in self._catalog_pending.items()
+        ]
+        self._catalog_pending = {}
+        self._hash_pending = False
+        return [json.dumps(record, separators=(',', ':')) for record in records]
+
+
+    def _live_records(self) -> int:
+        return (
+            len(self.known_gifts) + len(self.processed_gifts) + len(self.catalog) + 1 +
+            sum(len(buyer_purchases) for buyer_purchases in self.purchases.values()) +
+            len(self.poll_rates) + len(self.drops)
+        )
+
+
+    def _snapshot_lines(self) -> List[str]:
+        records = [["h", self.catalog_hash]]
+        records += [["g", self._gift_fields(gift)] for gift in self.catalog.values()]
+        records += [["k", gift_id] for gift_id in self.known_gifts]
+        records += [["p", gift_id] for gift_id in self.processed_gifts]
+        records += [
+            ["b", buyer_key, gift_id, count]
+            for buyer_key, buyer_purchases in self.purchases.items()
+            for gift_id, count in buyer_purchases.items()
+        ]
+        records += [["r", account, rate] for account, rate in self.poll_rates.items()]
+        records += [["d", timestamp] for timestamp in self.drops]
+        return [json.dumps(record, separators=(',', ':')) for record in records]
+
+
+    async def _compact(self) -> None:
+        lines = self._snapshot_lines()
+        self._pending = []
+        self._catalog_pending = {}
+        self._hash_pending = False
+
+        await asyncio.to_thread(self._write_atomic, lines)
+        self._records = len(lines)
+        logger.debug(f"Состояние сжато до {len(lines)} записей")
+
+
+    def _write_atomic(self, lines: List[str]) -> None:
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, self.path)
@@ -1,26 +1,28 @@
-import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
-from src.core.models import MonitorStats
+from src.core.models import LoopStats, MonitorStats, SchedulerStats, StageStats, TtfpStats
 from src.services.hunter import GiftHunter
 from src.services.buyer import GiftBuyer
-from src.utils import logger
+from src.services.tracing import Tracer
+from src.utils import logger, metrics, clock
 
 
 class StatsManager:
     
-    def __init__(self):
+    def __init__(self, tracer: Optional[Tracer] = None):
+        self.tracer = tracer or Tracer()
         self._total_checks = 0
         self._last_check_count = 0
-        self._last_check_time = time.time()
+        self._last_check_time = clock.monotonic()
     
 
     def increment_checks(self) -> None:
         self._total_checks += 1
+        metrics.inc("sniper_catalog_checks_total")
     
 
     def get_performance_stats(self) -> Dict[str, float]:
-        current_time = time.time()
+        current_time = clock.monotonic()
         checks_in_period = self._total_checks - self._last_check_count
         time_elapsed = current_time - self._last_check_time
         
@@ -39,16 +41,58 @@ class StatsManager:
         }
     
 
-    def log_performance(self, processed_gifts: int) -> None:
+    def get_ttfp_stats(self) -> TtfpStats:
+        return self.tracer.get_ttfp_stats()
+    
+
+    def log_performance(self, processed_gifts: int, 
+                        scheduler_stats: Optional[SchedulerStats] = None,
+                        pipeline_stats: Optional[List[StageStats]] = None,
+                        loop_stats: Optional[LoopStats] = None) -> None:
         stats = self.get_performance_stats()
         logger.info(
             f"Производительность: {stats['checks_per_minute']:.1f} проверок/мин, "
             f"Обработано подарков: {processed_gifts}"
         )
+        
+        if scheduler_stats and scheduler_stats.gap_samples:
+            logger.info(
+                f"Интервалы флота: цель {scheduler_stats.target_gap:.2f} сек, "
+                f"p50 {scheduler_stats.gap_p50:.2f} сек, p95 {scheduler_stats.gap_p95:.2f} сек, "
+                f"макс {scheduler_stats.gap_max:.2f} сек "
+                f"(активных охотников: {scheduler_stats.active_hunters}, режим {scheduler_stats.mode})"
+            )
+        
+        ttfp = self.get_ttfp_stats()
+        if ttfp.samples:
+            logger.info(
+                f"Время до первой покупки ({ttfp.samples} подарков): p50 {ttfp.p50 * 1000:.0f} мс, "
+                f"p95 {ttfp.p95 * 1000:.0f} мс, p99 {ttfp.p99 * 1000:.0f} мс"
+            )
+        
+        if loop_stats and loop_stats.lag_samples:
+            logger.info(
+                f"Цикл событий: задержка p50 {loop_stats.lag_p50 * 1000:.1f} мс, "
+                f"p95 {loop_stats.lag_p95 * 1000:.1f} мс, макс {loop_stats.lag_max * 1000:.1f} мс, "
+                f"блокировок {loop_stats.stalls} (во время покупки {loop_stats.purchase_stalls}, "
+                f"худшая {loop_stats.worst_stall * 1000:.0f} мс)"
+            )
+        
+        for stage in pipeline_stats or []:
+            if stage.processed or stage.depth:
+                logger.info(
+                    f"Этап {stage.name}: очередь {stage.depth}/{stage.capacity}, в работе {stage.in_flight}, "
+                    f"обработано {stage.processed} (ошибок {stage.failed}), "
+                    f"p50 {stage.latency_p50 * 1000:.1f} мс, p95 {stage.latency_p95 * 1000:.1f} мс, "
+                    f"{stage.throughput * 60:.1f}/мин"
+                )
     
 
     def collect_monitor_stats(self, is_running: bool, buyers: List[GiftBuyer], 
-                            hunters: List[GiftHunter], processed_gifts: int) -> MonitorStats:
+                            hunters: List[GiftHunter], processed_gifts: int,
+                            scheduler_stats: Optional[SchedulerStats] = None,
+                            pipeline_stats: Optional[List[StageStats]] = None,
+                            loop_stats: Optional[LoopStats] = None) -> MonitorStats:
         hunter_stats = [hunter.get_stats() for hunter in hunters]
         total_balance = sum(buyer.balance for buyer in buyers)
         
@@ -57,5 +101,9 @@ class StatsManager:
             processed_gifts=processed_gifts,
             buyer_balance=total_balance,
             total_checks=self._total_checks,
-            hunters=hunter_stats
+            hunters=hunter_stats,
+            scheduler=scheduler_stats,
+            pipeline=pipeline_stats or [],
+            ttfp=self.get_ttfp_stats(),
+            loop=loop_stats
         )
\ No newline at end of file
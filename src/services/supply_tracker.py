@@ -0,0 +1,140 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+from src.core.constants import TimeConstants
+from src.core.models import GiftAddedEvent, GiftSupplyDecreasedEvent, GiftSoldOutEvent, GiftRemovedEvent
+from src.services.catalog_diff import CatalogEvent
+from src.utils import clock
+
+
+STOP_SUPPLY_DEPLETED = "SUPPLY_DEPLETED"
+
+
+class GiftSupply:
+    
+    def __init__(self, observed_at: float, available: int):
+        self.samples: Deque[Tuple[float, int, int]] = deque([(observed_at, available, 0)])
+        self.sold_out = False
+        self.claims = 0
+        self.own_sales = 0
+        self.sales: Deque[float] = deque()
+        self.settled = asyncio.Event()
+    
+
+    def add_sample(self, observed_at: float, available: int, window: float) -> None:
+        landed_after = sum(1 for sold_at in self.sales if sold_at >= observed_at)
+        self.samples.append((max(observed_at, self.samples[-1][0]), available, self.own_sales - landed_after))
+        
+        newest = self.samples[-1][0]
+        while len(self.samples) > 2 and self.samples[1][0] <= newest - window:
+            self.samples.popleft()
+        while self.sales and self.sales[0] < newest - window:
+            self.sales.popleft()
+    
+
+    def record_sale(self, sold_at: float) -> None:
+        self.own_sales += 1
+        self.sales.append(sold_at)
+    
+
+    @property
+    def own_since_sample(self) -> int:
+        return self.own_sales - self.samples[-1][2]
+    
+
+    @property
+    def competitor_rate(self) -> float:
+        first_at, first_available, first_own = self.samples[0]
+        last_at, last_available, last_own = self.samples[-1]
+        if last_at <= first_at:
+            return 0.0
+        
+        sold_by_others = (first_available - last_available) - (last_own - first_own)
+        return max(0, sold_by_others) / (last_at - first_at)
+    
+
+    def remaining_at(self, moment: float) -> float:
+        if self.sold_out:
+            return 0.0
+        
+        sampled_at, available, _ = self.samples[-1]
+        return available - self.own_since_sample - self.competitor_rate * max(0.0, moment - sampled_at)
+
+
+
+class SupplyTracker:
+    
+    def __init__(self, window: float = TimeConstants.SUPPLY_RATE_WINDOW):
+        self.window = window
+        self.landing_latency = 0.0
+        self._gifts: Dict[int, GiftSupply] = {}
+    
+
+    def observe(self, event: CatalogEvent) -> None:
+        if isinstance(event, GiftAddedEvent):
+            if event.gift.available_amount is not None:
+                self._gifts[event.gift.id] = GiftSupply(event.observed_at, event.gift.available_amount)
+            return
+        
+        if isinstance(event, GiftRemovedEvent):
+            state = self._gifts.pop(event.gift_id, None)
+            if state:
+                state.settled.set()
+            return
+        
+        state = self._gifts.get(event.gift_id)
+        if isinstance(event, GiftSupplyDecreasedEvent):
+            if state is None:
+                self._gifts[event.gift_id] = GiftSupply(event.observed_at, event.available)
+            else:
+                state.add_sample(event.observed_at, event.available, self.window)
+                state.settled.set()
+        elif isinstance(event, GiftSoldOutEvent) and state is not None:
+            state.sold_out = True
+            state.settled.set()
+    
+
+    def confirm(self, observed_at: float) -> None:
+        for state in self._gifts.values():
+            sampled_at, available, _ = state.samples[-1]
+            if not state.sold_out and sampled_at < observed_at:
+                state.add_sample(observed_at, available, self.window)
+                state.settled.set()
+    
+
+    async def admit(self, gift_id: int) -> bool:
+        state = self._gifts.get(gift_id)
+        
+        while state is not None:
+            if state.sold_out:
+                return False
+            
+            remaining = state.remaining_at(clock.monotonic()) - state.competitor_rate * self.landing_latency
+            if remaining > state.claims or state.claims == 0:
+                state.claims += 1
+                return True
+            
+            state.settled.clear()
+            try:
+                await asyncio.wait_for(state.settled.wait(), timeout=TimeConstants.SUPPLY_ADMIT_TIMEOUT)
+            except asyncio.TimeoutError:
+                state.claims += 1
+                return True
+            state = self._gifts.get(gift_id)
+        
+        return True
+    
+
+    def settle(self, gift_id: int, landed: bool, latency: float = 0.0) -> None:
+        if landed:
+            self.landing_latency += TimeConstants.SUPPLY_LATENCY_SMOOTHING * (latency - self.landing_latency)
+        
+        state = self._gifts.get(gift_id)
+        if state is None:
+            return
+        
+        state.claims = max(0, state.claims - 1)
+        if landed:
+            state.record_sale(clock.monotonic())
+        state.settled.set()
@@ -0,0 +1,103 @@
+import asyncio
+import json
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, Optional
+
+from src.core.constants import Limits
+from src.core.models import GiftTrace, TraceSpan, TtfpStats
+from src.utils import logger, percentile, clock
+
+
+class Tracer:
+    
+    def __init__(self, export_path: Optional[Path] = None, capacity: int = Limits.TRACE_RING_SIZE):
+        self.export_path = export_path
+        self.capacity = capacity
+        self._traces: "OrderedDict[int, GiftTrace]" = OrderedDict()
+    
+
+    def begin(self, gift_id: int, origin: float) -> GiftTrace:
+        trace = self._traces.get(gift_id)
+        if trace is None:
+            trace = GiftTrace(gift_id=gift_id, origin=origin)
+            self._traces[gift_id] = trace
+            if len(self._traces) > self.capacity:
+                self._traces.popitem(last=False)
+        return trace
+    
+
+    def get(self, gift_id: int) -> Optional[GiftTrace]:
+        return self._traces.get(gift_id)
+    
+
+    def span(self, gift_id: int, name: str, start: float, end: Optional[float] = None, **attrs: Any) -> None:
+        trace = self._traces.get(gift_id)
+        if trace is None:
+            return
+        
+        if len(trace.spans) >= Limits.TRACE_MAX_SPANS:
+            trace.dropped_spans += 1
+            return
+        trace.spans.append(TraceSpan(name, start, clock.monotonic() if end is None else end, attrs))
+    
+
+    def success(self, gift_id: int, at: Optional[float] = None) -> None:
+        trace = self._traces.get(gift_id)
+        if trace is not None and trace.first_success is None:
+            trace.first_success = clock.monotonic() if at is None else at
+            logger.info(
+                f"Подарок {gift_id}: первая покупка через "
+                f"{trace.time_to_first_purchase * 1000:.0f} мс после начала запроса каталога"
+            )
+    
+
+    def finish(self, gift_id: int) -> None:
+        trace = self._traces.get(gift_id)
+        if trace is None or self.export_path is None:
+            return
+        
+        line = json.dumps(self.to_dict(trace), ensure_ascii=False)
+        asyncio.create_task(asyncio.to_thread(self._append, line))
+    
+
+    def _append(self, line: str) -> None:
+        try:
+            self.export_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.export_path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.error(f"Не удалось записать трассировку: {e}")
+    
+
+    @staticmethod
+    def to_dict(trace: GiftTrace) -> dict:
+        def ms(value: float) -> float:
+            return round((value - trace.origin) * 1000, 3)
+        
+        return {
+            'gift_id': trace.gift_id,
+            'ttfp_ms': round(trace.time_to_first_purchase * 1000, 3) if trace.first_success else None,
+            'dropped_spans': trace.dropped_spans,
+            'spans': [
+                {'name': span.name, 'start_ms': ms(span.start), 'end_ms': ms(span.end), **span.attrs}
+                for span in trace.spans
+            ]
+        }
+    
+
+    def traces(self) -> List[GiftTrace]:
+        return list(self._traces.values())
+    
+
+    def get_ttfp_stats(self) -> TtfpStats:
+        samples = [
+            trace.time_to_first_purchase for trace in self._traces.values()
+            if trace.first_success is not None
+        ]
+        return TtfpStats(
+            samples=len(samples),
+            p50=percentile(samples, 50),
+            p95=percentile(samples, 95),
+            p99=percentile(samples, 99)
+        )
@@ -0,0 +1,164 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Callable, Deque, Optional
+
+from src.core.constants import TimeConstants, Limits
+from src.core.models import LoopStall, LoopStats
+from src.utils import logger, metrics, percentile
+
+
+class LoopWatchdog:
+    
+    def __init__(self, threshold: float, busy: Optional[Callable[[], bool]] = None,
+                 probe_interval: float = TimeConstants.LOOP_LAG_PROBE_INTERVAL):
+        self.threshold = threshold
+        self.busy = busy or (lambda: False)
+        self.probe_interval = probe_interval
+        self.stalls: Deque[LoopStall] = deque(maxlen=Limits.LOOP_STALL_HISTORY)
+        self.stall_count: int = 0
+        self.purchase_stall_count: int = 0
+        self.worst_stall: float = 0.0
+        self._lags: Deque[float] = deque(maxlen=Limits.LOOP_LAG_SAMPLES)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._lock = threading.Lock()
+        self._ping_sent: Optional[float] = None
+        self._stall: Optional[LoopStall] = None
+        self._locations: Counter = Counter()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._task: Optional[asyncio.Task] = None
+    
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        self._task = asyncio.create_task(self._lag_probe())
+        logger.info(f"Сторож цикла событий запущен (порог {self.threshold * 1000:.0f} мс)")
+    
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        
+        if self._thread:
+            self._stopped.set()
+            self._thread.join(timeout=self.threshold)
+            self._thread = None
+    
+
+    async def _lag_probe(self) -> None:
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.probe_interval)
+            lag = max(0.0, loop.time() - started - self.probe_interval)
+            
+            self._lags.append(lag)
+            metrics.observe("sniper_event_loop_lag_seconds", lag)
+            metrics.set("sniper_event_loop_lag_last_seconds", lag)
+    
+
+    def _sample_loop(self) -> None:
+        while not self._stopped.wait(self.threshold / 2):
+            with self._lock:
+                now = time.monotonic()
+                if self._ping_sent is None:
+                    self._ping_sent = now
+                    try:
+                        self._loop.call_soon_threadsafe(self._pong)
+                    except RuntimeError:
+                        return
+                    continue
+                
+                if now - self._ping_sent < self.threshold:
+                    continue
+                
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is None:
+                    continue
+                
+                stack = self._callback_stack(frame)
+                if self._stall is None:
+                    self._stall = LoopStall(
+                        started_at=self._ping_sent,
+                        during_purchase=self.busy(),
+                        stack=[f"{entry.filename}:{entry.lineno} {entry.name}" for entry in stack]
+                    )
+                    self._locations.clear()
+                
+                innermost = stack[-1]
+                self._locations[f"{innermost.filename}:{innermost.lineno} {innermost.name}"] += 1
+                self._stall.samples += 1
+    
+
+    @staticmethod
+    def _callback_stack(frame) -> traceback.StackSummary:
+        stack = traceback.extract_stack(frame, limit=Limits.LOOP_STACK_DEPTH)
+        for index in range(len(stack) - 1, -1, -1):
+            if stack[index].filename == asyncio.events.__file__ and stack[index].name == "_run":
+                return traceback.StackSummary.from_list(stack[index + 1:]) or stack
+        return stack
+    
+
+    def _pong(self) -> None:
+        with self._lock:
+            delay = time.monotonic() - self._ping_sent
+            self._ping_sent = None
+            stall, self._stall = self._stall, None
+            if stall is not None:
+                stall.location = self._locations.most_common(1)[0][0]
+        
+        if stall is not None:
+            stall.duration = delay
+            stall.during_purchase = stall.during_purchase or self.busy()
+            self._report(stall)
+    
+
+    def _report(self, stall: LoopStall) -> None:
+        self.stalls.append(stall)
+        self.stall_count += 1
+        self.worst_stall = max(self.worst_stall, stall.duration)
+        if stall.during_purchase:
+            self.purchase_stall_count += 1
+        
+        during_purchase = "true" if stall.during_purchase else "false"
+        metrics.inc("sniper_event_loop_stalls_total", during_purchase=during_purchase)
+        metrics.observe("sniper_event_loop_stall_seconds", stall.duration, during_purchase=during_purchase)
+        
+        message = (
+            f"Цикл событий заблокирован на {stall.duration * 1000:.0f} мс"
+            f"{' во время покупки' if stall.during_purchase else ''}: {stall.location} "
+            f"({stall.samples} срезов стека)\n" + "\n".join(f"    {line}" for line in stall.stack)
+        )
+        if stall.during_purchase:
+            logger.error(message)
+        else:
+            logger.warning(message)
+    
+
+    def get_stats(self) -> LoopStats:
+        lags = list(self._lags)
+        return LoopStats(
+            lag_samples=len(lags),
+            lag_p50=percentile(lags, 50),
+            lag_p95=percentile(lags, 95),
+            lag_max=max(lags, default=0.0),
+            stalls=self.stall_count,
+            purchase_stalls=self.purchase_stall_count,
+            worst_stall=self.worst_stall,
+            last_stall=self.stalls[-1] if self.stalls else None
+        )
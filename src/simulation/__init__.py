@@ -0,0 +1,15 @@
+from .fake_client import FakeGiftMarket, FakeTelegramClient, rtt_distribution
+from .replay import ReplayClient, SessionRecording, SessionReplay
+from .virtual_loop import VirtualTimeEventLoop, run_virtual
+
+
+__all__ = [
+    "FakeGiftMarket",
+    "FakeTelegramClient",
+    "ReplayClient",
+    "SessionRecording",
+    "SessionReplay",
+    "VirtualTimeEventLoop",
+    "rtt_distribution",
+    "run_virtual"
+]
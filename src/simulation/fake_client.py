@@ -0,0 +1,223 @@
+import asyncio
+import itertools
+import math
+import random
+import zlib
+from typing import Callable, Dict, List, Optional, Union
+
+from pyrogram import raw, types
+from pyrogram.errors import BadRequest, FloodWait
+
+from src.core.constants import TelegramConstants
+
+
+RttSource = Union[float, Callable[[], float]]
+
+
+class FakeGiftMarket:
+    
+    def __init__(self):
+        self.hash: int = 1
+        self._gifts: Dict[int, raw.types.StarGift] = {}
+        self._form_ids = itertools.count(1)
+        self._open_forms: Dict[int, int] = {}
+        self.sold: Dict[int, int] = {}
+    
+
+    def __contains__(self, gift_id: int) -> bool:
+        return gift_id in self._gifts
+    
+
+    def add_gift(self, gift_id: int, price: int, total: Optional[int] = None,
+                 upgrade_stars: Optional[int] = None) -> None:
+        self._gifts[gift_id] = raw.types.StarGift(
+            id=gift_id,
+            sticker=self._sticker(gift_id),
+            stars=price,
+            convert_stars=price // 2,
+            limited=True if total is not None else None,
+            availability_total=total,
+            availability_remains=total,
+            upgrade_stars=upgrade_stars
+        )
+        self.hash += 1
+    
+
+    def remove_gift(self, gift_id: int) -> None:
+        if self._gifts.pop(gift_id, None) is not None:
+            self.hash += 1
+    
+
+    def set_remaining(self, gift_id: int, remaining: int) -> None:
+        gift = self._gifts[gift_id]
+        gift.availability_remains = max(0, remaining)
+        gift.sold_out = True if gift.availability_remains == 0 else None
+        self.hash += 1
+    
+
+    def remaining(self, gift_id: int) -> Optional[int]:
+        gift = self._gifts.get(gift_id)
+        return gift.availability_remains if gift else None
+    
+
+    def gifts(self) -> List[raw.types.StarGift]:
+        return list(self._gifts.values())
+    
+
+    def open_form(self, gift_id: int) -> int:
+        gift = self._gifts.get(gift_id)
+        if gift is None:
+            raise rpc_error("STARGIFT_INVALID")
+        if gift.sold_out:
+            raise rpc_error(TelegramConstants.ERROR_GIFT_SOLD_OUT)
+        
+        form_id = next(self._form_ids)
+        self._open_forms[form_id] = gift_id
+        return form_id
+    
+
+    def pay(self, form_id: int, client: "FakeTelegramClient") -> None:
+        gift_id = self._open_forms.pop(form_id, None)
+        if gift_id is None:
+            raise rpc_error("FORM_EXPIRED")
+        
+        gift = self._gifts[gift_id]
+        if gift.sold_out:
+            raise rpc_error(TelegramConstants.ERROR_GIFT_SOLD_OUT)
+        if client.balance < gift.stars:
+            raise rpc_error(TelegramConstants.ERROR_INSUFFICIENT_BALANCE)
+        
+        client.balance -= gift.stars
+        self.sold[gift_id] = self.sold.get(gift_id, 0) + 1
+        if gift.availability_remains is not None:
+            self.set_remaining(gift_id, gift.availability_remains - 1)
+    
+
+    @staticmethod
+    def _sticker(gift_id: int) -> raw.types.Document:
+        return raw.types.Document(
+            id=gift_id,
+            access_hash=gift_id,
+            file_reference=b"",
+            date=0,
+            mime_type="application/x-tgsticker",
+            size=0,
+            dc_id=2,
+            attributes=[
+                raw.types.DocumentAttributeSticker(alt="🎁", stickerset=raw.types.InputStickerSetEmpty()),
+                raw.types.DocumentAttributeImageSize(w=512, h=512)
+            ]
+        )
+
+
+def rpc_error(code: str) -> BadRequest:
+    return BadRequest(value=f"[400 {code}]")
+
+
+def rtt_distribution(spec: str, seed: Optional[int] = None) -> Callable[[], float]:
+    kind, *params = spec.split(":")
+    values = [float(param) for param in params]
+    rng = random.Random(seed)
+    
+    if kind == "fixed":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: rng.uniform(values[0], values[1])
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda: median * math.exp(rng.gauss(0.0, sigma))
+    
+    raise ValueError(f"Неизвестное распределение RTT: {spec}")
+
+
+class FakeTelegramClient:
+    
+    def __init__(self, market: FakeGiftMarket, name: str = "fake", balance: int = 0,
+                 rtt: RttSource = 0.0, flood_probability: float = 0.0,
+                 flood_seconds: int = 1, seed: Optional[int] = None):
+        self.market = market
+        self.name = name
+        self.balance = balance
+        self.rtt = rtt
+        self.flood_probability = flood_probability
+        self.flood_seconds = flood_seconds
+        self.calls: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self._random = random.Random(seed)
+    
+
+    async def _round_trip(self, method: str) -> None:
+        self.calls[method] = self.calls.get(method, 0) + 1
+        
+        delay = self.rtt() if callable(self.rtt) else self.rtt
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            await asyncio.sleep(0)
+        
+        if self.flood_probability and self._random.random() < self.flood_probability:
+            self.errors["FLOOD_WAIT"] = self.errors.get("FLOOD_WAIT", 0) + 1
+            raise FloodWait(value=self.flood_seconds)
+    
+
+    async def invoke(self, query):
+        method = type(query).__name__
+        await self._round_trip(method)
+        
+        try:
+            if isinstance(query, raw.functions.payments.GetStarGifts):
+                if query.hash == self.market.hash:
+                    return raw.types.payments.StarGiftsNotModified()
+                return raw.types.payments.StarGifts(
+                    hash=self.market.hash, gifts=self.market.gifts(), chats=[], users=[]
+                )
+            
+            if isinstance(query, raw.functions.payments.GetPaymentForm):
+                form_id = self.market.open_form(query.invoice.gift_id)
+                return raw.types.payments.PaymentFormStarGift(
+                    form_id=form_id,
+                    invoice=raw.types.Invoice(currency="XTR", prices=[])
+                )
+            
+            if isinstance(query, raw.functions.payments.SendStarsForm):
+                self.market.pay(query.form_id, self)
+                return raw.types.payments.PaymentResult(
+                    updates=raw.types.Updates(updates=[], users=[], chats=[], date=0, seq=0)
+                )
+        except BadRequest as e:
+            code = str(e.value).strip("[]").split()[-1]
+            self.errors[code] = self.errors.get(code, 0) + 1
+            raise
+        
+        raise NotImplementedError(method)
+    
+
+    async def get_available_gifts(self) -> list:
+        response = await self.invoke(raw.functions.payments.GetStarGifts(hash=0))
+        return [await types.Gift._parse_regular(self, gift) for gift in response.gifts]
+    
+
+    async def get_stars_balance(self) -> int:
+        await self._round_trip("GetStarsStatus")
+        return self.balance
+    
+
+    async def resolve_peer(self, peer_id: Union[int, str]) -> raw.types.InputPeerChannel:
+        return raw.types.InputPeerChannel(
+            channel_id=zlib.crc32(str(peer_id).encode()),
+            access_hash=0
+        )
+    
+
+    async def send_gift(self, chat_id: Union[int, str], gift_id: int, hide_my_name: bool = None) -> bool:
+        invoice = raw.types.InputInvoiceStarGift(
+            peer=await self.resolve_peer(chat_id), gift_id=gift_id, hide_name=hide_my_name
+        )
+        form = await self.invoke(raw.functions.payments.GetPaymentForm(invoice=invoice))
+        await self.invoke(raw.functions.payments.SendStarsForm(form_id=form.form_id, invoice=invoice))
+        return True
+    
+
+    @property
+    def total_calls(self) -> int:
+        return sum(self.calls.values())
@@ -0,0 +1,224 @@
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from pyrogram.errors import FloodWait
+
+import config
+from src.core.constants import TimeConstants
+from src.core.models import GiftCriteria, ReplayGiftResult, ReplayReport
+from src.services.monitor import GiftMonitor
+from src.simulation.fake_client import FakeGiftMarket, FakeTelegramClient
+from src.simulation.virtual_loop import run_virtual
+from src.utils import logger, clock
+
+
+RECORDED_METHODS = {
+    "GetStarGifts": "get_available_gifts",
+    "GetPaymentForm": "get_payment_form",
+    "SendStarsForm": "send_gift",
+    "GetStarsStatus": "get_stars_balance"
+}
+
+REPLAY_SETTINGS = {
+    "RECORD_SESSION": False,
+    "TRACE_EXPORT": False,
+    "METRICS_PORT": 0,
+    "LOOP_STALL_THRESHOLD": 0
+}
+
+RpcSample = Tuple[float, Optional[str]]
+
+
+class SessionRecording:
+    
+    def __init__(self, started_at: float, catalogs: List[Tuple[float, list]],
+                 rpc: Dict[str, List[RpcSample]]):
+        self.started_at = started_at
+        self.catalogs = catalogs
+        self.rpc = rpc
+    
+
+    @classmethod
+    def load(cls, path: Path) -> "SessionRecording":
+        started_at = 0.0
+        catalogs: List[Tuple[float, list]] = []
+        rpc: Dict[str, List[RpcSample]] = {}
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                
+                record = json.loads(line)
+                if record[0] == "start":
+                    started_at = record[1]
+                elif record[0] == "c":
+                    catalogs.append((record[1], record[2]))
+                elif record[0] == "r":
+                    rpc.setdefault(record[2], []).append((record[4], record[5]))
+        
+        catalogs.sort(key=lambda item: item[0])
+        return cls(started_at, catalogs, rpc)
+    
+
+    @property
+    def duration(self) -> float:
+        return self.catalogs[-1][0] if self.catalogs else 0.0
+    
+
+    @property
+    def rpc_count(self) -> int:
+        return sum(len(samples) for samples in self.rpc.values())
+
+
+
+class ReplayClient(FakeTelegramClient):
+    
+    def __init__(self, market: FakeGiftMarket, recording: SessionRecording, name: str,
+                 balance: int = 0, flood_seconds: int = 1, seed: Optional[int] = None):
+        super().__init__(market, name=name, balance=balance, flood_seconds=flood_seconds, seed=seed)
+        self.recording = recording
+    
+
+    async def _round_trip(self, method: str) -> None:
+        self.calls[method] = self.calls.get(method, 0) + 1
+        
+        samples = self.recording.rpc.get(RECORDED_METHODS.get(method, method))
+        latency, error = self._random.choice(samples) if samples else (0.0, None)
+        await asyncio.sleep(latency)
+        
+        if error == "FLOOD_WAIT":
+            self.errors[error] = self.errors.get(error, 0) + 1
+            raise FloodWait(value=self.flood_seconds)
+
+
+
+class SessionReplay:
+    
+    def __init__(self, recording: SessionRecording, criteria: List[GiftCriteria],
+                 buyers: int = 1, hunters: int = 1, balance: int = 100000,
+                 flood_seconds: int = 1, seed: int = 0,
+                 settings: Optional[Dict[str, Any]] = None):
+        self.recording = recording
+        self.criteria = criteria
+        self.buyers = buyers
+        self.hunters = hunters
+        self.balance = balance
+        self.flood_seconds = flood_seconds
+        self.seed = seed
+        self.settings = {**REPLAY_SETTINGS, **(settings or {})}
+    
+
+    def run(self) -> ReplayReport:
+        saved = {name: getattr(config, name) for name in self.settings}
+        for name, value in self.settings.items():
+            setattr(config, name, value)
+        
+        started = time.perf_counter()
+        catalogs = self.recording.catalogs
+        try:
+            report = run_virtual(
+                self._replay(), self.recording.started_at + (catalogs[0][0] if catalogs else 0.0)
+            )
+        finally:
+            for name, value in saved.items():
+                setattr(config, name, value)
+        
+        report.wall_time = time.perf_counter() - started
+        return report
+    
+
+    @staticmethod
+    def apply_catalog(market: FakeGiftMarket, fields: list) -> None:
+        present = set()
+        for gift_id, price, is_limited, is_sold_out, total, available, can_upgrade in fields:
+            present.add(gift_id)
+            if gift_id not in market:
+                market.add_gift(gift_id, price, total if is_limited else None, 0 if can_upgrade else None)
+            
+            if is_limited:
+                remaining = 0 if is_sold_out else available
+                if remaining < market.remaining(gift_id):
+                    market.set_remaining(gift_id, remaining)
+        
+        for gift in market.gifts():
+            if gift.id not in present:
+                market.remove_gift(gift.id)
+    
+
+    async def _replay(self) -> ReplayReport:
+        random.seed(self.seed)
+        market = FakeGiftMarket()
+        catalogs = self.recording.catalogs
+        
+        initial = catalogs[0][1] if catalogs else []
+        self.apply_catalog(market, initial)
+        
+        buyer_clients = [
+            ReplayClient(market, self.recording, f"replay_buyer_{idx}", self.balance,
+                         self.flood_seconds, seed=self.seed + idx)
+            for idx in range(self.buyers)
+        ]
+        hunter_clients = [
+            ReplayClient(market, self.recording, f"replay_hunter_{idx}",
+                         flood_seconds=self.flood_seconds, seed=self.seed + self.buyers + idx)
+            for idx in range(self.hunters)
+        ]
+        
+        monitor = GiftMonitor(buyer_clients, hunter_clients, self.criteria)
+        for gift_id, _, is_limited, *_ in initial:
+            if is_limited:
+                monitor.registry.claim(gift_id)
+        
+        if not await monitor.initialize():
+            raise RuntimeError("Не удалось инициализировать монитор для воспроизведения")
+        
+        origin = clock.monotonic()
+        first_seen: Dict[int, float] = {}
+        await monitor.start()
+        
+        try:
+            for offset, fields in catalogs[1:]:
+                delay = origin + offset - catalogs[0][0] - clock.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                
+                for gift_id, *_ in fields:
+                    if gift_id not in market and gift_id not in first_seen:
+                        first_seen[gift_id] = clock.monotonic() - origin
+                self.apply_catalog(market, fields)
+            
+            await asyncio.sleep(TimeConstants.REPLAY_TAIL)
+        finally:
+            await monitor.stop()
+        
+        gifts = []
+        for gift_id, appeared_at in sorted(first_seen.items(), key=lambda item: item[1]):
+            result = ReplayGiftResult(gift_id=gift_id, appeared_at=appeared_at, bought=market.sold.get(gift_id, 0))
+            trace = monitor.tracer.get(gift_id)
+            if trace is not None:
+                detected = next((span.end for span in trace.spans if span.name == "diff"), None)
+                if detected is not None:
+                    result.detected_at = detected - origin
+                if trace.first_success is not None:
+                    result.first_purchase_at = trace.first_success - origin
+            gifts.append(result)
+        
+        report = ReplayReport(
+            duration=clock.monotonic() - origin,
+            wall_time=0.0,
+            checks=monitor.stats_manager.get_performance_stats()['total_checks'],
+            rpc_calls=sum(client.total_calls for client in buyer_clients + hunter_clients),
+            bought=sum(market.sold.values()),
+            spent=sum(self.balance - client.balance for client in buyer_clients),
+            gifts=gifts
+        )
+        logger.info(
+            f"Воспроизведение завершено: {report.duration:.0f} сек сессии, "
+            f"{report.checks} проверок, куплено {report.bought}"
+        )
+        return report
@@ -0,0 +1,68 @@
+import asyncio
+import selectors
+from typing import Awaitable, Optional, TypeVar
+
+from src.utils import clock
+
+
+T = TypeVar("T")
+
+
+class VirtualSelector:
+    
+    def __init__(self, selector: selectors.BaseSelector, loop: "VirtualTimeEventLoop"):
+        self._selector = selector
+        self._loop = loop
+    
+
+    def select(self, timeout: Optional[float] = None) -> list:
+        events = self._selector.select(0)
+        if events or timeout == 0:
+            return events
+        
+        if timeout is None:
+            return self._selector.select(None)
+        
+        self._loop.advance(timeout)
+        return []
+    
+
+    def __getattr__(self, name: str):
+        return getattr(self._selector, name)
+
+
+
+class VirtualTimeEventLoop(asyncio.SelectorEventLoop):
+    
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        super().__init__(VirtualSelector(selectors.DefaultSelector(), self))
+    
+
+    def time(self) -> float:
+        return self._now
+    
+
+    def advance(self, seconds: float) -> None:
+        if seconds > 0:
+            self._now += seconds
+
+
+def run_virtual(main: Awaitable[T], wall_start: Optional[float] = None) -> T:
+    loop = VirtualTimeEventLoop()
+    asyncio.set_event_loop(loop)
+    clock.use(loop.time, wall_start)
+    try:
+        result = loop.run_until_complete(main)
+        
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        return result
+    finally:
+        clock.reset()
+        asyncio.set_event_loop(None)
+        loop.close()
@@ -31,10 +31,30 @@ class BotCommands:
                     f"🔍 Охотников: {len(stats.get('hunters', []))}"
                 )
                 
+                scheduler = stats.get('scheduler')
+                if scheduler and scheduler.gap_samples:
+                    response += (
+                        f"\n⏱ Интервал флота: p50 {scheduler.gap_p50:.2f}с, "
+                        f"p95 {scheduler.gap_p95:.2f}с (цель {scheduler.target_gap:.2f}с)"
+                    )
+                
+                ttfp = stats.get('ttfp')
+                if ttfp and ttfp.samples:
+                    response += (
+                        f"\n⚡ До первой покупки: p50 {ttfp.p50 * 1000:.0f}мс, "
+                        f"p95 {ttfp.p95 * 1000:.0f}мс, p99 {ttfp.p99 * 1000:.0f}мс"
+                    )
+                
+                loop = stats.get('loop')
+                if loop and loop.lag_samples:
+                    response += (
+                        f"\n🌀 Цикл событий: p95 {loop.lag_p95 * 1000:.0f}мс, "
+                        f"блокировок {loop.stalls} (при покупке {loop.purchase_stalls})"
+                    )
+                
                 await message.reply(response)
                 logger.info(f"Ping от пользователя {message.from_user.id}")
                 
             except Exception as e:
                 await message.reply("❌ Ошибка получения статистики")
                 logger.error(f"Ошибка ping команды: {e}")
-        
\ No newline at end of file
@@ -1,18 +1,22 @@
 import asyncio
+import time
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any
 
 from pyrogram import Client
 
+from src.core.constants import TimeConstants
 from src.utils import logger
 from src.utils.credentials_manager import CredentialsManager
 
 
 class ClientManager:
     
-    def __init__(self, sessions_dir: Path):
+    def __init__(self, sessions_dir: Path, startup_concurrency: int = 8):
         self.sessions_dir = sessions_dir
         self.credentials_manager = CredentialsManager(sessions_dir)
+        self.startup_times: Dict[str, float] = {}
+        self._startup_slots = asyncio.Semaphore(max(1, startup_concurrency))
     
 
     def create_client(self, session_name: str) -> Optional[Client]:
@@ -28,55 +32,75 @@ class ClientManager:
         )
     
 
-    async def create_and_start_clients(self, buyer_sessions: List[str], 
-                                     hunter_sessions: List[str],
-                                     use_buyers_as_hunters: bool) -> Dict[str, Any]:
-        result = {
-            'buyers': [],
-            'hunters': [],
-            'success': False
-        }
-        
-        for idx, buyer_session in enumerate(buyer_sessions):
-            buyer_client = self.create_client(buyer_session)
-            if not buyer_client:
-                continue
+    async def start_client(self, session_name: str, role: str, number: int) -> Optional[Client]:
+        async with self._startup_slots:
+            client = self.create_client(session_name)
+            if not client:
+                return None
             
+            started = time.monotonic()
             try:
-                await buyer_client.start()
-                buyer_info = await buyer_client.get_me()
-                logger.info(
-                    f"Покупатель #{idx+1}: {buyer_info.first_name} "
-                    f"(@{buyer_info.username or 'no_username'})"
+                info = await asyncio.wait_for(self._connect(client), timeout=TimeConstants.CLIENT_START_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.error(
+                    f"{role} {session_name} не запустился за {TimeConstants.CLIENT_START_TIMEOUT:.0f} сек"
                 )
-                result['buyers'].append(buyer_client)
+                await self._release(client)
+                return None
+            except asyncio.CancelledError:
+                await self._release(client)
+                raise
             except Exception as e:
-                logger.error(f"Ошибка запуска покупателя {buyer_session}: {e}")
-        
-        if use_buyers_as_hunters:
-            result['hunters'].extend(result['buyers'])
-            logger.info(f"Покупатели также используются как охотники ({len(result['buyers'])} шт)")
-        
-        for idx, hunter_name in enumerate(hunter_sessions):
-            await asyncio.sleep(1)
-
-            hunter_client = self.create_client(hunter_name)
-            if not hunter_client:
-                continue
+                logger.error(f"Ошибка запуска {session_name} ({role.lower()}): {e}")
+                await self._release(client)
+                return None
             
-            try:
-                await hunter_client.start()
-                hunter_info = await hunter_client.get_me()
-                logger.info(
-                    f"Охотник #{idx+1}: {hunter_info.first_name} "
-                    f"(@{hunter_info.username or 'no_username'})"
-                )
-                result['hunters'].append(hunter_client)
-            except Exception as e:
-                logger.error(f"Ошибка запуска охотника {hunter_name}: {e}")
+            elapsed = time.monotonic() - started
+            self.startup_times[session_name] = elapsed
+            logger.info(
+                f"{role} #{number}: {info.first_name} "
+                f"(@{info.username or 'no_username'}) за {elapsed:.2f} сек"
+            )
+            return client
+    
+
+    @staticmethod
+    async def _connect(client: Client) -> Any:
+        await client.start()
+        return await client.get_me()
+    
+
+    @staticmethod
+    async def _release(client: Client) -> None:
+        try:
+            if client.is_initialized:
+                await client.terminate()
+            if client.is_connected:
+                await client.disconnect()
+        except Exception as e:
+            logger.warning(f"Не удалось закрыть сессию {client.name}: {e}")
+    
+
+    async def start_buyers(self, buyer_sessions: List[str]) -> List[Client]:
+        clients = await asyncio.gather(*(
+            self.start_client(session, "Покупатель", idx + 1) for idx, session in enumerate(buyer_sessions)
+        ))
+        return [client for client in clients if client]
+    
+
+    async def start_hunters(self, hunter_sessions: List[str],
+                            on_ready: Optional[Callable[[Client], None]] = None) -> List[Client]:
+        hunters = []
+        
+        async def start(idx: int, session: str) -> None:
+            client = await self.start_client(session, "Охотник", idx + 1)
+            if client:
+                hunters.append(client)
+                if on_ready:
+                    on_ready(client)
         
-        result['success'] = len(result['buyers']) > 0 and len(result['hunters']) > 0
-        return result
+        await asyncio.gather(*(start(idx, session) for idx, session in enumerate(hunter_sessions)))
+        return hunters
     
 
     async def stop_all(self, buyers: List[Client], hunters: List[Client]) -> None:
@@ -0,0 +1,171 @@
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional
+
+from pyrogram.errors import FloodWait
+
+from src.core.constants import Limits, TelegramConstants, TimeConstants
+from src.utils import logger, metrics, clock
+
+
+class TokenBucket:
+    
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = clock.monotonic()
+        self._blocked_until = 0.0
+    
+
+    def _refill(self) -> None:
+        now = clock.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+
+    async def acquire(self) -> None:
+        while True:
+            pause = self._blocked_until - clock.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+    
+
+    def block(self, seconds: float) -> None:
+        self._tokens = 0.0
+        self._updated = clock.monotonic()
+        self._blocked_until = max(self._blocked_until, self._updated + seconds)
+
+
+
+class Notification:
+    
+    def __init__(self, text: str, key: Optional[str] = None):
+        self.key = key
+        self.texts = [text]
+        self.created = clock.monotonic()
+    
+
+    def merge(self, text: str) -> None:
+        self.texts.append(text)
+    
+
+    @property
+    def size(self) -> int:
+        return sum(len(text) for text in self.texts) + len(TelegramConstants.DIGEST_SEPARATOR) * len(self.texts)
+
+
+
+class NotificationDispatcher:
+    
+    def __init__(self, send: Callable[[str], Awaitable[None]], rate: float, burst: int):
+        self.send = send
+        self.bucket = TokenBucket(rate, burst)
+        self._lanes: List[Deque[Notification]] = [deque(), deque()]
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._task: Optional[asyncio.Task] = None
+    
+
+    def submit(self, text: str, priority: bool = False, key: Optional[str] = None) -> None:
+        lane = self._lanes[0 if priority else 1]
+        
+        if key is not None:
+            for pending in lane:
+                if pending.key == key and pending.size + len(text) <= TelegramConstants.DIGEST_MAX_LENGTH:
+                    pending.merge(text)
+                    metrics.inc("sniper_notifications_coalesced_total")
+                    return
+        
+        lane.append(Notification(text, key))
+        self._drained.clear()
+        self._wakeup.set()
+    
+
+    @property
+    def backlog(self) -> int:
+        return sum(len(lane) for lane in self._lanes)
+    
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._dispatch_loop())
+    
+
+    async def stop(self, timeout: float = TimeConstants.NOTIFICATION_DRAIN_TIMEOUT) -> None:
+        if self._task:
+            try:
+                await asyncio.wait_for(self._drained.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Не отправлено уведомлений при остановке: {self.backlog}")
+            
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+
+    async def _dispatch_loop(self) -> None:
+        while True:
+            if not self.backlog:
+                self._drained.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            
+            await self.bucket.acquire()
+            batch = self._take_batch()
+            text = self._render(batch)
+            
+            try:
+                await self.send(text)
+                metrics.inc("sniper_notification_messages_total")
+                metrics.inc("sniper_notifications_sent_total", sum(len(item.texts) for item in batch))
+            except FloodWait as e:
+                logger.warning(f"FloodWait при отправке уведомлений: {e.value} сек")
+                self.bucket.block(e.value)
+                self._requeue(batch)
+            except Exception as e:
+                logger.error(f"Ошибка отправки уведомления: {e}")
+    
+
+    def _take_batch(self) -> List[Notification]:
+        lane = self._lanes[0] if self._lanes[0] else self._lanes[1]
+        head = lane.popleft()
+        batch = [head]
+        size = head.size
+        
+        digest_mode = self.backlog >= Limits.NOTIFICATION_DIGEST_BACKLOG
+        for source in self._lanes:
+            while source:
+                item = source[0]
+                if not digest_mode and item.created - head.created > TimeConstants.NOTIFICATION_DIGEST_WINDOW:
+                    break
+                if size + item.size > TelegramConstants.DIGEST_MAX_LENGTH:
+                    return batch
+                batch.append(source.popleft())
+                size += item.size
+        
+        return batch
+    
+
+    def _requeue(self, batch: List[Notification]) -> None:
+        for item in reversed(batch):
+            self._lanes[0].appendleft(item)
+    
+
+    @staticmethod
+    def _render(batch: List[Notification]) -> str:
+        texts = [text for item in batch for text in item.texts]
+        if len(texts) == 1:
+            return texts[0]
+        
+        header = f"📬 **Сводка уведомлений ({len(texts)})**"
+        return TelegramConstants.DIGEST_SEPARATOR.join([header] + texts)
@@ -1,16 +1,15 @@
-import asyncio
 import json
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
 
 from pyrogram import Client
-from pyrogram.errors import RPCError
 
 from src.utils import logger
-from src.core.constants import TimeConstants
+from src.core.constants import TelegramConstants
 from src.core.models import GiftData
 from src.telegram.bot_commands import BotCommands
+from src.telegram.dispatcher import NotificationDispatcher
 
 
 class NotificationBot:
@@ -21,8 +20,11 @@ class NotificationBot:
         self.sessions_dir = Path(sessions_dir)
         self.bot: Optional[Client] = None
         self._initialized = False
-        self._queue: asyncio.Queue = asyncio.Queue()
-        self._worker_task: Optional[asyncio.Task] = None
+        self.dispatcher = NotificationDispatcher(
+            send=self._send_message,
+            rate=TelegramConstants.BOT_GROUP_CHAT_RATE if chat_id < 0 else TelegramConstants.BOT_PRIVATE_CHAT_RATE,
+            burst=TelegramConstants.BOT_BURST
+        )
         self._get_monitor_stats = lambda: {}
 
 
@@ -79,7 +81,7 @@ class NotificationBot:
                 self.commands.setup_handlers()
                 self._commands = self.commands
             
-            self._worker_task = asyncio.create_task(self._process_queue())
+            self.dispatcher.start()
             
             return True
             
@@ -88,39 +90,21 @@ class NotificationBot:
             return False
     
 
-    async def _process_queue(self) -> None:
-        while self._initialized:
-            try:
-                message = await self._queue.get()
-                await self._send_message(message)
-                await asyncio.sleep(TimeConstants.QUEUE_PROCESS_DELAY)
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Ошибка в обработчике очереди: {e}")
-    
-
     async def _send_message(self, text: str) -> None:
         if not self._initialized or not self.bot:
             return
         
-        try:
-            await self.bot.send_message(
-                chat_id=self.chat_id,
-                text=text
-            )
-        except RPCError as e:
-            logger.error(f"Ошибка отправки уведомления: {e}")
+        await self.bot.send_message(
+            chat_id=self.chat_id,
+            text=text
+        )
     
 
-    async def send_notification(self, text: str, priority: bool = False) -> None:
+    async def send_notification(self, text: str, priority: bool = False, key: Optional[str] = None) -> None:
         if not self._initialized:
             return
         
-        if priority:
-            asyncio.create_task(self._send_message(text))
-        else:
-            await self._queue.put(text)
+        self.dispatcher.submit(text, priority, key)
     
 
     async def send_startup_message(self, accounts_count: int, balance: int) -> None:
@@ -141,7 +125,7 @@ class NotificationBot:
             f"📦 Количество: {gift_data.total_amount:,}\n"
             f"🔄 Улучшаемый: {'✅' if gift_data.can_upgrade else '❌'}"
         )
-        await self.send_notification(message)
+        await self.send_notification(message, key=f"gift:{gift_data.id}")
     
 
     async def send_purchase_success(self, gift_id: int, quantity: int, total_spent: int) -> None:
@@ -151,7 +135,7 @@ class NotificationBot:
             f"📦 Куплено: {quantity} шт.\n"
             f"💸 Потрачено: {total_spent:,} Stars"
         )
-        await self.send_notification(message, priority=True)
+        await self.send_notification(message, priority=True, key=f"purchase:{gift_id}")
     
 
     async def send_purchase_error(self, gift_id: int, error: str) -> None:
@@ -160,7 +144,7 @@ class NotificationBot:
             f"🎁 Подарок ID: `{gift_id}`\n"
             f"⚠️ Ошибка: {error}"
         )
-        await self.send_notification(message, priority=True)
+        await self.send_notification(message, priority=True, key=f"purchase:{gift_id}")
     
 
     async def send_low_balance_warning(self, current: int, required: int) -> None:
@@ -181,14 +165,8 @@ class NotificationBot:
     
 
     async def cleanup(self) -> None:
+        await self.dispatcher.stop()
         self._initialized = False
         
-        if self._worker_task:
-            self._worker_task.cancel()
-            try:
-                await self._worker_task
-            except asyncio.CancelledError:
-                pass
-        
         if self.bot:
             await self.bot.stop()
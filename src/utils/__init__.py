@@ -1,11 +1,19 @@
 from .logger import logger, setup_logger
 from .validator import ConfigValidator
 from .credentials_manager import CredentialsManager
+from .percentile import percentile
+from .metrics import metrics, MetricsRegistry
+from .clock import clock, Clock
 
 
 __all__ = [
     "logger", 
     "setup_logger", 
     "ConfigValidator", 
-    "CredentialsManager"
+    "CredentialsManager",
+    "percentile",
+    "metrics",
+    "MetricsRegistry",
+    "clock",
+    "Clock"
 ]
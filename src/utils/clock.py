@@ -0,0 +1,31 @@
+import time
+from typing import Callable, Optional
+
+
+class Clock:
+    
+    def __init__(self):
+        self._source: Callable[[], float] = time.monotonic
+        self._wall: Callable[[], float] = time.time
+    
+
+    def monotonic(self) -> float:
+        return self._source()
+    
+
+    def time(self) -> float:
+        return self._wall()
+    
+
+    def use(self, source: Callable[[], float], wall_start: Optional[float] = None) -> None:
+        offset = (time.time() if wall_start is None else wall_start) - source()
+        self._source = source
+        self._wall = lambda: source() + offset
+    
+
+    def reset(self) -> None:
+        self._source = time.monotonic
+        self._wall = time.time
+
+
+clock = Clock()
@@ -17,7 +17,8 @@ def setup_logger(debug: bool = False) -> None:
                "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
                "<level>{message}</level>",
         level=level,
-        colorize=True
+        colorize=True,
+        enqueue=True
     )
     
     logs_dir = Path(FileConstants.LOGS_DIR)
@@ -29,7 +30,8 @@ def setup_logger(debug: bool = False) -> None:
         retention=f"{FileConstants.LOG_RETENTION_DAYS} days",
         level="DEBUG",
         format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | "
-               "{name}:{function}:{line} - {message}"
+               "{name}:{function}:{line} - {message}",
+        enqueue=True
     )
 
 
@@ -0,0 +1,184 @@
+from bisect import bisect_left
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from pyrogram.errors import FloodWait
+
+from src.core.constants import Limits
+from src.utils.clock import clock
+
+
+Labels = Tuple[Tuple[str, str], ...]
+RpcListener = Callable[[str, str, float, Optional[str]], None]
+
+LATENCY_BUCKETS = tuple(
+    Limits.HISTOGRAM_MIN_VALUE * 2 ** (index / Limits.HISTOGRAM_SUB_BUCKETS)
+    for index in range(Limits.HISTOGRAM_BUCKETS)
+)
+
+
+class Histogram:
+    
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+
+class MetricsRegistry:
+    
+    def __init__(self):
+        self._types: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._rpc_listeners: List[RpcListener] = []
+    
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        self._types[name] = kind
+        self._help[name] = help_text
+    
+
+    @staticmethod
+    def _labels(labels: Dict[str, object]) -> Labels:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+    
+
+    def inc(self, name: str, amount: float = 1, **labels: object) -> None:
+        series = self._counters.setdefault(name, {})
+        key = self._labels(labels)
+        series[key] = series.get(key, 0) + amount
+    
+
+    def set(self, name: str, value: float, **labels: object) -> None:
+        self._gauges.setdefault(name, {})[self._labels(labels)] = value
+    
+
+    def observe(self, name: str, value: float, **labels: object) -> None:
+        series = self._histograms.setdefault(name, {})
+        key = self._labels(labels)
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(value)
+    
+
+    def add_rpc_listener(self, listener: RpcListener) -> None:
+        self._rpc_listeners.append(listener)
+    
+
+    def remove_rpc_listener(self, listener: RpcListener) -> None:
+        if listener in self._rpc_listeners:
+            self._rpc_listeners.remove(listener)
+    
+
+    @asynccontextmanager
+    async def rpc(self, method: str, account: str) -> AsyncIterator[None]:
+        started = clock.monotonic()
+        error: Optional[str] = None
+        try:
+            yield
+        except FloodWait as e:
+            error = "FLOOD_WAIT"
+            self.inc("sniper_flood_wait_total", method=method, account=account)
+            self.inc("sniper_flood_wait_seconds_total", e.value, method=method, account=account)
+            self.inc("sniper_rpc_errors_total", method=method, account=account, error=error)
+            raise
+        except BaseException as e:
+            error = self.error_class(e)
+            self.inc("sniper_rpc_errors_total", method=method, account=account, error=error)
+            raise
+        finally:
+            latency = clock.monotonic() - started
+            self.observe("sniper_rpc_latency_seconds", latency, method=method, account=account)
+            for listener in self._rpc_listeners:
+                listener(method, account, latency, error)
+    
+
+    @staticmethod
+    def error_class(error: BaseException) -> str:
+        return getattr(error, "ID", None) or type(error).__name__
+    
+
+    def render(self) -> str:
+        lines: List[str] = []
+        
+        def header(name: str, kind: str) -> None:
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {self._types.get(name, kind)}")
+        
+        for name, series in sorted(self._counters.items()):
+            header(name, "counter")
+            for labels, value in series.items():
+                lines.append(f"{name}{self._format_labels(labels)} {self._format_value(value)}")
+        
+        for name, series in sorted(self._gauges.items()):
+            header(name, "gauge")
+            for labels, value in series.items():
+                lines.append(f"{name}{self._format_labels(labels)} {self._format_value(value)}")
+        
+        for name, series in sorted(self._histograms.items()):
+            header(name, "histogram")
+            for labels, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip(histogram.bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(
+                        f"{name}_bucket{self._format_labels(labels + (('le', self._format_value(bound)),))} {cumulative}"
+                    )
+                lines.append(f"{name}_bucket{self._format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                lines.append(f"{name}_sum{self._format_labels(labels)} {self._format_value(histogram.sum)}")
+                lines.append(f"{name}_count{self._format_labels(labels)} {histogram.count}")
+        
+        return "\n".join(lines) + "\n"
+    
+
+    @staticmethod
+    def _format_labels(labels: Labels) -> str:
+        if not labels:
+            return ""
+        pairs = (
+            key + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+            for key, value in labels
+        )
+        return "{" + ",".join(pairs) + "}"
+    
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        if float(value).is_integer():
+            return str(int(value))
+        return repr(float(value))
+
+
+metrics = MetricsRegistry()
+metrics.describe("sniper_rpc_latency_seconds", "histogram", "Задержка запросов к Telegram по методу и аккаунту")
+metrics.describe("sniper_poll_pause_seconds", "histogram", "Пауза опроса каталога, пока на аккаунте идет покупка")
+metrics.describe("sniper_rpc_errors_total", "counter", "Ошибки запросов к Telegram по классу ошибки")
+metrics.describe("sniper_flood_wait_total", "counter", "Количество FloodWait")
+metrics.describe("sniper_flood_wait_seconds_total", "counter", "Суммарное время FloodWait в секундах")
+metrics.describe("sniper_purchase_units_total", "counter", "Исходы покупки отдельных подарков")
+metrics.describe("sniper_purchase_wasted_rpc_total", "counter", "Запросы покупки, не принесшие подарка, по дропам")
+metrics.describe("sniper_catalog_checks_total", "counter", "Проверки каталога подарков")
+metrics.describe("sniper_catalog_events_total", "counter", "Изменения каталога: новые, уменьшение остатка, распроданные, удаленные")
+metrics.describe("sniper_poll_mode", "gauge", "Текущий режим опроса: idle, normal или burst")
+metrics.describe("sniper_event_loop_lag_seconds", "histogram", "Задержка цикла событий asyncio")
+metrics.describe("sniper_event_loop_lag_last_seconds", "gauge", "Последнее измерение задержки цикла событий")
+metrics.describe("sniper_event_loop_stalls_total", "counter", "Блокировки цикла событий дольше порога")
+metrics.describe("sniper_event_loop_stall_seconds", "histogram", "Длительность блокировок цикла событий")
+metrics.describe("sniper_events_emitted_total", "counter", "События, поставленные в очередь шины событий")
+metrics.describe("sniper_events_dropped_total", "counter", "События, пропущенные из-за переполнения очереди")
+metrics.describe("sniper_notification_messages_total", "counter", "Сообщения бота уведомлений, включая сводки")
+metrics.describe("sniper_notifications_sent_total", "counter", "Отправленные уведомления")
+metrics.describe("sniper_notifications_coalesced_total", "counter", "Уведомления, объединенные с уже ожидающими")
@@ -1,8 +1,8 @@
 from pathlib import Path
 from typing import Any, List, Tuple
 
-from src.core.models import GiftCriteria
-from src.core.constants import FileConstants
+from src.core.models import GiftCriteria, DropWindow
+from src.core.constants import FileConstants, TelegramConstants
 from src.utils.credentials_manager import CredentialsManager
 from src.utils.logger import logger
 
@@ -85,9 +85,41 @@ class ConfigValidator:
         if config.MIN_STARS_BALANCE < 0:
             errors.append("MIN_STARS_BALANCE не может быть отрицательным")
         
+        if config.POLL_INTERVAL_MIN <= 0:
+            errors.append("POLL_INTERVAL_MIN должен быть больше 0")
+        
+        if config.IDLE_POLL_INTERVAL <= 0:
+            errors.append("IDLE_POLL_INTERVAL должен быть больше 0")
+        
+        for entry in config.DROP_SCHEDULE:
+            try:
+                DropWindow.parse(entry)
+            except ValueError as e:
+                errors.append(f"DROP_SCHEDULE: {e}")
+        
+        if config.CLIENT_STARTUP_CONCURRENCY < 1:
+            errors.append("CLIENT_STARTUP_CONCURRENCY должен быть больше 0")
+        
         if config.CHECK_INTERVAL <= 0:
             errors.append("CHECK_INTERVAL должен быть больше 0")
         
+        if config.PURCHASE_WINDOW < 1 or config.PURCHASE_WINDOW_MAX < config.PURCHASE_WINDOW:
+            errors.append("PURCHASE_WINDOW должен быть >= 1 и не больше PURCHASE_WINDOW_MAX")
+        
+        if config.PAYMENT_FORM_PREFETCH < 0:
+            errors.append("PAYMENT_FORM_PREFETCH не может быть отрицательным")
+        
+        if not 0 <= config.METRICS_PORT <= 65535:
+            errors.append("METRICS_PORT должен быть от 0 до 65535")
+        
+        if config.LOOP_STALL_THRESHOLD < 0:
+            errors.append("LOOP_STALL_THRESHOLD не может быть отрицательным")
+        
+        if config.CATALOG_HASH_MODE not in TelegramConstants.CATALOG_HASH_MODES:
+            errors.append(
+                f"CATALOG_HASH_MODE должен быть одним из: {', '.join(TelegramConstants.CATALOG_HASH_MODES)}"
+            )
+        
         return len(errors) == 0, errors
     
 
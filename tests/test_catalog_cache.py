@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+import config
+from src.services.catalog import CatalogCache
+from src.services.hunter import GiftHunter
+from src.services.monitor import GiftMonitor
+from src.simulation import FakeGiftMarket, FakeTelegramClient
+
+
+def build_market() -> FakeGiftMarket:
+    market = FakeGiftMarket()
+    market.add_gift(1, price=50)
+    market.add_gift(2, price=100, total=500)
+    return market
+
+
+def fetch(hunter: GiftHunter):
+    return asyncio.run(hunter.fetch())
+
+
+def build_monitor(monkeypatch, mode: str, clients) -> GiftMonitor:
+    monkeypatch.setattr(config, "CATALOG_HASH_MODE", mode)
+    monkeypatch.setattr(config, "RECORD_SESSION", False)
+    monkeypatch.setattr(config, "TRACE_EXPORT", False)
+    monkeypatch.setattr(config, "METRICS_PORT", 0)
+    return GiftMonitor([], clients, [])
+
+
+def test_not_modified_short_circuits():
+    market = build_market()
+    client = FakeTelegramClient(market)
+    cache = CatalogCache()
+    hunter = GiftHunter(client, 0, catalog_cache=cache)
+
+    snapshot = fetch(hunter)
+    assert [gift.id for gift in snapshot.gifts] == [2]
+    assert cache.hash == market.hash
+
+    assert fetch(hunter) is None
+    assert hunter.get_stats().not_modified_checks == 1
+    assert client.calls["GetStarGifts"] == 2
+
+
+def test_hash_follows_catalog_changes():
+    market = build_market()
+    cache = CatalogCache()
+    hunter = GiftHunter(FakeTelegramClient(market), 0, catalog_cache=cache)
+
+    fetch(hunter)
+    first_hash = cache.hash
+
+    market.set_remaining(2, 120)
+    snapshot = fetch(hunter)
+    assert snapshot is not None
+    assert snapshot.gifts[0].available_amount == 120
+    assert cache.hash == market.hash != first_hash
+
+    market.add_gift(3, price=25, total=10)
+    snapshot = fetch(hunter)
+    assert sorted(gift.id for gift in snapshot.gifts) == [2, 3]
+    assert cache.hash == market.hash
+    assert fetch(hunter) is None
+
+
+def test_error_resets_hash():
+    market = build_market()
+    client = FakeTelegramClient(market)
+    cache = CatalogCache()
+    hunter = GiftHunter(client, 0, catalog_cache=cache)
+    fetch(hunter)
+
+    invoke = client.invoke
+
+    async def failing_invoke(query):
+        client.invoke = invoke
+        raise RuntimeError("connection reset")
+
+    client.invoke = failing_invoke
+    with pytest.raises(RuntimeError):
+        fetch(hunter)
+    assert cache.hash == 0
+
+    snapshot = fetch(hunter)
+    assert snapshot is not None
+    assert cache.hash == market.hash
+
+
+def test_shared_mode_uses_one_hash(monkeypatch):
+    market = build_market()
+    clients = [FakeTelegramClient(market, name=f"hunter_{idx}") for idx in range(2)]
+    monitor = build_monitor(monkeypatch, "shared", clients)
+    first, second = monitor.hunters
+
+    assert first.catalog_cache is second.catalog_cache is monitor.registry.catalog
+    assert fetch(first) is not None
+    assert fetch(second) is None
+
+    market.set_remaining(2, 0)
+    assert fetch(second).gifts[0].is_sold_out
+    assert fetch(first) is None
+
+
+def test_hunter_mode_keeps_separate_hashes(monkeypatch):
+    market = build_market()
+    clients = [FakeTelegramClient(market, name=f"hunter_{idx}") for idx in range(2)]
+    monitor = build_monitor(monkeypatch, "hunter", clients)
+    first, second = monitor.hunters
+
+    assert first.catalog_cache is not second.catalog_cache
+    assert fetch(first) is not None
+    assert fetch(second) is not None
+    assert fetch(first) is None
+    assert fetch(second) is None
+
+    market.set_remaining(2, 300)
+    assert fetch(first) is not None
+    assert fetch(second) is not None
+    assert first.catalog_cache.hash == second.catalog_cache.hash == market.hash
+
+
+def test_off_mode_always_fetches_full_catalog(monkeypatch):
+    market = build_market()
+    monitor = build_monitor(monkeypatch, "off", [FakeTelegramClient(market)])
+    hunter = monitor.hunters[0]
+
+    assert hunter.catalog_cache is None
+    assert fetch(hunter) is not None
+    assert fetch(hunter) is not None
@@ -0,0 +1,47 @@
+import asyncio
+from typing import Tuple
+
+from src.simulation.virtual_loop import run_virtual
+from src.utils import clock
+from src.telegram.dispatcher import NotificationDispatcher
+
+
+def test_stop_drains_pending_notifications():
+    sent = []
+
+    async def send(text: str) -> None:
+        sent.append(text)
+
+    async def main() -> NotificationDispatcher:
+        dispatcher = NotificationDispatcher(send, rate=1.0, burst=1)
+        dispatcher.start()
+        for idx in range(3):
+            dispatcher.submit(f"gift {idx}", priority=True)
+        await dispatcher.stop(timeout=30)
+        return dispatcher
+
+    dispatcher = run_virtual(main())
+    assert dispatcher.backlog == 0
+    assert all(f"gift {idx}" in "".join(sent) for idx in range(3))
+
+
+def test_stop_gives_up_after_timeout():
+    sent = []
+
+    async def send(text: str) -> None:
+        sent.append(text)
+
+    async def main() -> Tuple[NotificationDispatcher, float]:
+        dispatcher = NotificationDispatcher(send, rate=0.01, burst=1)
+        dispatcher.start()
+        dispatcher.submit("gift 0", priority=True)
+        await asyncio.sleep(3)
+        dispatcher.submit("gift 1", priority=True)
+        started = clock.monotonic()
+        await dispatcher.stop(timeout=5)
+        return dispatcher, clock.monotonic() - started
+
+    dispatcher, elapsed = run_virtual(main())
+    assert elapsed < 6
+    assert sent == ["gift 0"]
+    assert dispatcher.backlog == 1
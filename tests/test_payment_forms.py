@@ -0,0 +1,48 @@
+from typing import Tuple
+
+import config
+from src.core.models import GiftAddedEvent, GiftData
+from src.services.buyer import GiftBuyer
+from src.services.supply_tracker import SupplyTracker
+from src.simulation import FakeGiftMarket, FakeTelegramClient
+from src.simulation.virtual_loop import run_virtual
+from src.utils import clock
+
+
+def configure(monkeypatch) -> None:
+    monkeypatch.setattr(config, "PAYMENT_FORM_PREFETCH", 4)
+    monkeypatch.setattr(config, "PURCHASE_WINDOW", 1)
+    monkeypatch.setattr(config, "PURCHASE_WINDOW_MAX", 1)
+    monkeypatch.setattr(config, "PURCHASE_DELAY", 0)
+
+
+async def build_buyer(market: FakeGiftMarket, name: str, balance: int, buyer_id: int) -> GiftBuyer:
+    client = FakeTelegramClient(market, name=name, balance=balance, rtt=0.05)
+    buyer = GiftBuyer(client, ["target"], buyer_id)
+    await buyer.initialize()
+    return buyer
+
+
+def test_cancelled_prefetch_settles_supply_claims(monkeypatch):
+    configure(monkeypatch)
+    market = FakeGiftMarket()
+    market.add_gift(1, price=10, total=8)
+
+    async def main() -> Tuple[int, int, float]:
+        supply = SupplyTracker()
+        gift = GiftData.from_raw_star_gift(market.gifts()[0])
+        supply.observe(GiftAddedEvent(gift=gift, observed_at=clock.monotonic()))
+
+        broke = await build_buyer(market, "broke", 10, 0)
+        first = await broke.buy_gift(1, 8, supply=supply)
+        claims = supply._gifts[1].claims
+
+        funded = await build_buyer(market, "funded", 1000, 1)
+        started = clock.monotonic()
+        second = await funded.buy_gift(1, 7, supply=supply)
+        return first.bought + second.bought, claims, clock.monotonic() - started
+
+    bought, leaked_claims, elapsed = run_virtual(main())
+    assert leaked_claims == 0
+    assert bought == 8
+    assert elapsed < 5
@@ -0,0 +1,35 @@
+import pytest
+
+from src.core.models import GiftCriteria, GiftData
+from src.services.buyer import GiftBuyer
+from src.services.purchase_manager import PurchaseManager
+from src.simulation import FakeGiftMarket, FakeTelegramClient
+
+
+def limited_gift(gift_id: int, total: int, price: int = 10) -> GiftData:
+    return GiftData(
+        id=gift_id, price=price, is_limited=True, is_sold_out=False,
+        total_amount=total, available_amount=total, can_upgrade=False
+    )
+
+
+def build_manager(balance: int) -> PurchaseManager:
+    buyer = GiftBuyer(FakeTelegramClient(FakeGiftMarket(), balance=balance), ["target"], 0)
+    buyer.ledger.reset(balance)
+    criteria = [GiftCriteria(min_supply=50000, max_supply=200000, min_price=1, max_price=100, quantity=100)]
+    return PurchaseManager([buyer], criteria, fallback_purchase=True)
+
+
+def allocations(manager: PurchaseManager, gifts) -> dict:
+    plan = manager.plan(manager.select(gifts))
+    return {planned.gift.id: planned.allocations.get(0, 0) for planned in plan}
+
+
+@pytest.mark.parametrize("balance, expected", [
+    (500, {1: 50, 2: 0}),
+    (1500, {1: 100, 2: 50}),
+])
+def test_fallback_gets_only_budget_left_after_criteria(balance, expected):
+    manager = build_manager(balance)
+    gifts = [limited_gift(1, total=100000), limited_gift(2, total=1000)]
+    assert allocations(manager, gifts) == expected